@@ -0,0 +1,86 @@
+"""Measure CLI startup cost with `python -X importtime` and fail on regressions.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 10 --max-ms 300
+
+Importing `dbconvert.cli` must not load SQLAlchemy or any database driver;
+those are only imported by the commands that need them. The script exits with
+status 1 if one of them is imported, or if the median import time is above
+`--max-ms`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+MODULE = "dbconvert.cli"
+
+# Modules that only the conversion commands may import
+FORBIDDEN_MODULES = ("sqlalchemy", "psycopg2", "pymysql", "dbconvert.converters", "dbconvert.core.pipeline", "dbconvert.writers")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times() -> Dict[str, Tuple[int, int]]:
+    """Import MODULE in a fresh interpreter and return (self, cumulative) microseconds per module."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        capture_output=True, text=True, check=True, env=env
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def help_wall_time() -> float:
+    """Run `dbconvert --help` end to end and return its wall-clock time in milliseconds."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))}
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", MODULE, "--help"], capture_output=True, check=True, env=env)
+    return (time.perf_counter() - started) * 1000
+
+
+def forbidden_imports(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(name for name in times if name.startswith(FORBIDDEN_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the median import time of the CLI exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    cumulative_ms = [run[MODULE][1] / 1000 for run in runs]
+    median_ms = statistics.median(cumulative_ms)
+    help_ms = statistics.median(help_wall_time() for _ in range(args.runs))
+
+    print(f"import {MODULE}: median {median_ms:.1f} ms over {args.runs} runs (min {min(cumulative_ms):.1f}, max {max(cumulative_ms):.1f})")
+    print(f"dbconvert --help: median {help_ms:.1f} ms wall clock")
+    print("\nSlowest modules by self time (last run):")
+    for name, (self_us, cumulative_us) in sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failed = False
+    forbidden = forbidden_imports(runs[-1])
+    if forbidden:
+        print(f"\nFAIL: {MODULE} imports modules reserved for the conversion commands: {', '.join(forbidden)}")
+        failed = True
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"\nFAIL: median import time {median_ms:.1f} ms is above the {args.max_ms:.1f} ms limit")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
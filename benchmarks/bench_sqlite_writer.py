@@ -0,0 +1,89 @@
+"""Compare SQLiteWriter insert throughput with and without the bulk-load profile.
+
+Three writers load the same batches:
+
+- per-batch: the writer before batched transactions, committing every batch
+  with default pragmas (`transaction_rows=1`);
+- default: the current default writer, committing every DEFAULT_TRANSACTION_ROWS rows;
+- bulk-load: the bulk-load profile, built in a `.partial` file.
+
+Usage:
+    python benchmarks/bench_sqlite_writer.py --rows 1000000 --chunk-size 10000
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from dbconvert.writers.sqlite_writer import SQLiteWriter
+
+TABLE = "bench"
+META = {
+    "columns": [
+        {"name": "id", "type": "INTEGER", "nullable": False},
+        {"name": "name", "type": "TEXT", "nullable": True},
+        {"name": "amount", "type": "REAL", "nullable": True},
+        {"name": "created_at", "type": "TEXT", "nullable": True},
+        {"name": "payload", "type": "BLOB", "nullable": True},
+    ],
+    "primary_keys": {"constrained_columns": ["id"]},
+    "foreign_keys": [],
+}
+
+
+def make_batches(rows: int, chunk_size: int):
+    rng = random.Random(42)
+    name = "".join(rng.choices(string.ascii_letters, k=24))
+    payload = os.urandom(64)
+    for start in range(0, rows, chunk_size):
+        yield [
+            (i, name, rng.random() * 1000, "2024-01-01 12:00:00", payload)
+            for i in range(start, min(start + chunk_size, rows))
+        ]
+
+
+def run(label: str, path: str, batches, **writer_options) -> float:
+    writer = SQLiteWriter(path, **writer_options)
+    started = time.perf_counter()
+    writer.create_table(TABLE, META)
+    rows = 0
+    for batch in batches:
+        rows += writer.insert_rows(TABLE, META, batch)
+    writer.commit()
+    writer.finalize([(TABLE, META)])
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"{label:<10} {rows:>10} rows in {elapsed:8.2f}s  {rate:>12,.0f} rows/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=None)
+    parser.add_argument("--cache-size-mb", type=int, default=None)
+    args = parser.parse_args()
+
+    # Materialize the batches up front so only the writer is timed
+    batches = list(make_batches(args.rows, args.chunk_size))
+    with tempfile.TemporaryDirectory() as tmp:
+        # Any batch reaches one row, so every batch is committed on its own
+        baseline_rate = run("per-batch", os.path.join(tmp, "per_batch.sqlite"), batches, transaction_rows=1)
+        default_rate = run("default", os.path.join(tmp, "default.sqlite"), batches)
+        bulk_rate = run(
+            "bulk-load",
+            os.path.join(tmp, "bulk.sqlite"),
+            batches,
+            bulk_load=True,
+            page_size=args.page_size,
+            cache_size_mb=args.cache_size_mb,
+        )
+    print(f"default speedup over per-batch: {default_rate / baseline_rate:.2f}x")
+    print(f"bulk-load speedup over per-batch: {bulk_rate / baseline_rate:.2f}x, over default: {bulk_rate / default_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Generate synthetic source databases for the benchmarks.
+
+The schema and data are fully determined by the parameters and the seed, so
+two runs with the same arguments convert exactly the same database. Any
+SQLAlchemy URL can be used as the target; tables are named `bench_tNNN` and
+are dropped and recreated.
+
+Usage:
+    python benchmarks/synthetic.py --url sqlite:////tmp/bench_source.db --tables 8 --rows 100000
+"""
+import argparse
+import datetime
+import decimal
+import random
+import string
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    create_engine,
+)
+
+TABLE_PREFIX = "bench_t"
+INSERT_BATCH = 5000
+
+# Column types cycled through for the data columns of every table
+COLUMN_TYPES = [
+    ("int", Integer),
+    ("txt", lambda: String(64)),
+    ("flt", Float),
+    ("ts", DateTime),
+    ("num", lambda: Numeric(12, 2)),
+    ("flag", Boolean),
+]
+
+
+@dataclass
+class SyntheticSpec:
+    """Shape of a synthetic database."""
+
+    tables: int = 4
+    rows: int = 100000
+    # Data columns per table, on top of the id and foreign key columns
+    columns: int = 8
+    # The first `blob_tables` tables get a payload column of `blob_bytes` bytes
+    blob_tables: int = 0
+    blob_bytes: int = 4096
+    # Each table after the first references a random earlier table
+    foreign_keys: bool = True
+    seed: int = 42
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def table_name(index: int) -> str:
+    return f"{TABLE_PREFIX}{index:03d}"
+
+
+def build_schema(spec: SyntheticSpec) -> MetaData:
+    rng = random.Random(spec.seed)
+    metadata = MetaData()
+    for index in range(spec.tables):
+        columns: List[Column] = [Column("id", Integer, primary_key=True, autoincrement=False)]
+        if spec.foreign_keys and index > 0:
+            parent = table_name(rng.randrange(index))
+            columns.append(Column("parent_id", Integer, ForeignKey(f"{parent}.id"), index=True))
+        for n in range(spec.columns):
+            name, column_type = COLUMN_TYPES[n % len(COLUMN_TYPES)]
+            columns.append(Column(f"{name}_{n}", column_type()))
+        if index < spec.blob_tables:
+            columns.append(Column("payload", LargeBinary))
+        Table(table_name(index), metadata, *columns)
+    return metadata
+
+
+def generate_rows(spec: SyntheticSpec, table: Table, index: int):
+    """Yield the rows of one table in insert batches."""
+    rng = random.Random(spec.seed * 1000 + index)
+    base_time = datetime.datetime(2024, 1, 1)
+    words = ["".join(rng.choices(string.ascii_letters, k=rng.randint(8, 48))) for _ in range(256)]
+    payload = rng.randbytes(spec.blob_bytes) if hasattr(rng, "randbytes") else bytes(rng.getrandbits(8) for _ in range(spec.blob_bytes))
+    has_parent = "parent_id" in table.c
+
+    batch = []
+    for row_id in range(1, spec.rows + 1):
+        row: Dict[str, Any] = {"id": row_id}
+        if has_parent:
+            row["parent_id"] = rng.randint(1, spec.rows)
+        for column in table.columns:
+            kind = column.name.split("_")[0]
+            if kind == "int":
+                row[column.name] = rng.randint(-(2 ** 31), 2 ** 31 - 1)
+            elif kind == "txt":
+                row[column.name] = words[rng.randrange(len(words))]
+            elif kind == "flt":
+                row[column.name] = rng.random() * 1e6
+            elif kind == "ts":
+                row[column.name] = base_time + datetime.timedelta(seconds=rng.randrange(10 ** 8))
+            elif kind == "num":
+                row[column.name] = decimal.Decimal(rng.randrange(10 ** 9)) / 100
+            elif kind == "flag":
+                row[column.name] = rng.random() < 0.5
+            elif kind == "payload":
+                row[column.name] = payload
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_source(url: str, spec: SyntheticSpec) -> List[str]:
+    """Create the synthetic tables at `url` and return their names in creation order."""
+    engine = create_engine(url)
+    metadata = build_schema(spec)
+    # Drop whatever an earlier run with a different spec left behind
+    existing = MetaData()
+    existing.reflect(engine, only=lambda name, _: name.startswith(TABLE_PREFIX))
+    existing.drop_all(engine)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            for batch in generate_rows(spec, table, int(table.name[len(TABLE_PREFIX):])):
+                conn.execute(table.insert(), batch)
+    engine.dispose()
+    return [table.name for table in metadata.sorted_tables]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    defaults = SyntheticSpec()
+    for field, value in defaults.as_dict().items():
+        option = f"--{field.replace('_', '-')}"
+        if isinstance(value, bool):
+            parser.add_argument(option, type=lambda v: v.lower() in ("1", "true", "yes"), default=value)
+        else:
+            parser.add_argument(option, type=type(value), default=value)
+    args = vars(parser.parse_args())
+    url = args.pop("url")
+    names = generate_source(url, SyntheticSpec(**args))
+    print(f"Created {len(names)} tables at {url}")
+
+
+if __name__ == "__main__":
+    main()
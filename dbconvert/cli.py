@@ -1,18 +1,79 @@
+import logging
 import typer
 from dbconvert.core.loggingsetup import LoggerManager
-from dbconvert.converters.converter_factory import ConverterFactory
-from dbconvert.writers.sqlite_writer import SQLiteWriter
+from dbconvert.core.defaults import DEFAULT_CHUNK_SIZE, DEFAULT_PARTITION_ROWS, DEFAULT_VERIFY_CHUNK_ROWS
 from dbconvert.core.enums import DatabaseType
+from dbconvert.core.filters import SourceFilters
 import os
-from dbconvert.core.metadata import load_pyproject_metadata
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
+from typing import Any, Dict, List
+from dbconvert.core.metadata import load_package_metadata
+
+# SQLAlchemy, the database drivers and the conversion engine are imported
+# inside the commands that use them, so `--help` and light commands start fast.
 
 app = typer.Typer(help="Convert SQL databases to SQLite. Supports both Command-Line and Graphical User Interfaces.")
 logger = LoggerManager.get_logger()
 
+def parse_table_options(values: List[str], option: str) -> Dict[str, str]:
+    """Parse repeated TABLE=VALUE options into a dict."""
+    parsed = {}
+    for value in values:
+        table_name, sep, setting = value.partition("=")
+        if not sep or not table_name or not setting:
+            raise ValueError(f"Invalid {option} value '{value}', expected TABLE=VALUE")
+        parsed[table_name] = setting
+    return parsed
+
+def parse_type_overrides(values: List[str]) -> Dict[str, str]:
+    """Parse repeated TABLE.COLUMN=TYPE options into a dict."""
+    overrides = parse_table_options(values, "--type")
+    for column in overrides:
+        table_name, sep, column_name = column.partition(".")
+        if not sep or not table_name or not column_name:
+            raise ValueError(f"Invalid --type value '{column}', expected TABLE.COLUMN=TYPE")
+    return overrides
+
+def parse_connect_args(values: List[str]) -> Dict[str, Any]:
+    """Parse repeated KEY=VALUE driver options, turning integers and true/false into Python values."""
+    connect_args: Dict[str, Any] = {}
+    for value in values:
+        key, sep, setting = value.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Invalid --connect-arg value '{value}', expected KEY=VALUE")
+        if setting.lstrip("-").isdigit():
+            connect_args[key] = int(setting)
+        elif setting.lower() in ("true", "false"):
+            connect_args[key] = setting.lower() == "true"
+        else:
+            connect_args[key] = setting
+    return connect_args
+
+def build_filters(
+    config: str, include: List[str], exclude: List[str], columns: List[str], where: List[str], sample: List[str]
+) -> SourceFilters:
+    """Combine the filters of a config file with those given on the command line, which take precedence."""
+    sample_percent = {}
+    for table_name, percent in parse_table_options(sample, "--sample").items():
+        try:
+            sample_percent[table_name] = float(percent)
+        except ValueError:
+            raise ValueError(f"Invalid --sample value for {table_name}: '{percent}' is not a percentage")
+    cli_filters = SourceFilters(
+        include,
+        exclude,
+        {table_name: [col.strip() for col in value.split(",") if col.strip()] for table_name, value in parse_table_options(columns, "--columns").items()},
+        parse_table_options(where, "--where"),
+        sample_percent,
+    )
+    if config:
+        return SourceFilters.from_config(config).merge(cli_filters)
+    return cli_filters
+
 def print_banner(version, author, author_url, repo):
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.text import Text
+
     console = Console()
     banner_text = Text()
     banner_text.append("\n██████╗ ██████╗  ██████╗ ██████╗ ███╗   ██╗██╗   ██╗███████╗██████╗ ████████╗", style="bold blue")
@@ -28,13 +89,25 @@ def print_banner(version, author, author_url, repo):
     console.print(Panel(banner_text, expand=False, border_style="blue", title="Welcome", title_align="left"))
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context):
-    metadata = load_pyproject_metadata()
+def main(
+    ctx: typer.Context,
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Only show warnings and errors; no banner or progress bars"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Also show debug messages, such as per-batch timings (rate-limited)")
+):
+    if quiet and verbose:
+        logger.error("--quiet and --verbose cannot be used together")
+        raise typer.Exit(1)
+    if quiet:
+        LoggerManager.set_level(logging.WARNING)
+        return
+    if verbose:
+        LoggerManager.set_level(logging.DEBUG)
+    metadata = load_package_metadata()
     version = metadata.get("version")
     repo = metadata.get("repository")
     internal_urls = metadata.get("internalurls", {})
-    author = f"{internal_urls.get('author_name')}"
-    author_url = f"{internal_urls.get('author_linkedin')}"
+    author = internal_urls.get("author_name", "unknown")
+    author_url = internal_urls.get("author_linkedin", "")
     print_banner(version, author, author_url, repo)
     if ctx.invoked_subcommand is None:
         logger.info("No command provided. Use --help for usage.")
@@ -69,11 +142,37 @@ def supported_databases():
 def convert(
     source: str = typer.Option(..., help=f"Source database type ({', '.join(DatabaseType.values())})"),
     conn: str = typer.Option(..., help="Source database connection string"),
-    sqlite: str = typer.Option(..., help="Target SQLite database file path")
+    sqlite: str = typer.Option(..., help="Target SQLite database file path"),
+    schema: str = typer.Option(None, "--schema", help="Source schema to convert (default: the connection's default schema)"),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", min=1, help="Number of rows fetched from the source and written to SQLite per batch"),
+    workers: int = typer.Option(1, "--workers", min=1, help="Number of tables read concurrently from a shared consistent snapshot"),
+    partition_rows: int = typer.Option(DEFAULT_PARTITION_ROWS, "--partition-rows", min=0, help="Split tables with more rows than this into primary key ranges read by several workers (0 disables)"),
+    bulk_load: bool = typer.Option(False, "--bulk-load", help="Build the SQLite file with journaling and fsync disabled, then move it into place atomically"),
+    page_size: int = typer.Option(None, "--page-size", help="SQLite page size in bytes for --bulk-load and --optimize (power of two between 512 and 65536)"),
+    cache_size_mb: int = typer.Option(None, "--cache-size-mb", min=1, help="SQLite page cache size in MiB for --bulk-load"),
+    skip_indexes: bool = typer.Option(False, "--skip-indexes", help="Do not copy secondary indexes and unique constraints"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted conversion from its last checkpoint"),
+    optimize: bool = typer.Option(False, "--optimize", help="Use WITHOUT ROWID tables where they pay off, run ANALYZE and compact the finished file with VACUUM INTO"),
+    column_type: List[str] = typer.Option([], "--type", help="TABLE.COLUMN=TYPE SQLite type override, e.g. orders.total=NUMERIC"),
+    copy: bool = typer.Option(False, "--copy", help="Read PostgreSQL tables with COPY ... TO STDOUT instead of SELECT"),
+    large_object_mb: float = typer.Option(None, "--large-object-mb", min=0.001, help="Read and write binary values larger than this many MiB in pieces, keeping memory flat (Python 3.11+)"),
+    connect_arg: List[str] = typer.Option([], "--connect-arg", help="KEY=VALUE option for the database driver, e.g. read_timeout=600 (repeatable)"),
+    schema_cache: str = typer.Option(None, "--schema-cache", help="File that caches the reflected schema between runs while the source schema is unchanged"),
+    metrics_out: str = typer.Option(None, "--metrics-out", help="Write per-table metrics to this file: Prometheus textfile format for *.prom, JSON otherwise"),
+    config: str = typer.Option(None, "--config", help="TOML file with include/exclude globs and per-table columns, where and sample settings"),
+    include: List[str] = typer.Option([], "--include", help="Only convert tables matching this glob (repeatable)"),
+    exclude: List[str] = typer.Option([], "--exclude", help="Skip tables matching this glob (repeatable)"),
+    columns: List[str] = typer.Option([], "--columns", help="TABLE=COL1,COL2 columns to read from a table (repeatable)"),
+    where: List[str] = typer.Option([], "--where", help="TABLE=PREDICATE SQL filter applied by the source, e.g. \"orders=created_at >= now() - interval '90 days'\""),
+    sample: List[str] = typer.Option([], "--sample", help="TABLE=PERCENT share of rows to read, sampled by the source")
 ):
     """
     Convert a PostgreSQL or MySQL database to SQLite.
     """
+    from dbconvert.converters.converter_factory import ConverterFactory
+    from dbconvert.core.pipeline import ConversionPipeline
+    from dbconvert.writers.sqlite_writer import SQLiteWriter
+
     try:
         # Validate source database type
         if source not in DatabaseType.values():
@@ -88,17 +187,45 @@ def convert(
         if sqlite_dir and not os.path.exists(sqlite_dir):
             os.makedirs(sqlite_dir)
         
+        options = {}
+        if copy:
+            if source != DatabaseType.POSTGRES.value:
+                raise ValueError("--copy is only supported for PostgreSQL sources")
+            options["use_copy"] = True
+
         # Create converter using factory
-        converter = ConverterFactory.create_converter(source, conn)
+        converter = ConverterFactory.create_converter(
+            source,
+            conn,
+            chunk_size=chunk_size,
+            workers=workers,
+            type_overrides=parse_type_overrides(column_type),
+            connect_args=parse_connect_args(connect_arg),
+            schema_cache=schema_cache,
+            filters=build_filters(config, include, exclude, columns, where, sample),
+            schema=schema,
+            large_object_threshold=int(large_object_mb * 1024 * 1024) if large_object_mb else None,
+            **options
+        )
         
-        # Read source database
-        logger.info("Reading source database...")
-        tables = converter.read_all_tables()
-        
-        # Write to SQLite
-        logger.info("Writing to SQLite database...")
-        writer = SQLiteWriter(sqlite)
-        writer.write_all_tables(tables)
+        # Stream source tables into SQLite, reading and writing concurrently
+        logger.info(f"Streaming source database to SQLite in chunks of {chunk_size} rows...")
+        writer = SQLiteWriter(
+            sqlite,
+            bulk_load=bulk_load,
+            page_size=page_size,
+            cache_size_mb=cache_size_mb,
+            create_indexes=not skip_indexes,
+            resume=resume,
+            optimize=optimize
+        )
+        pipeline = ConversionPipeline(converter, writer, partition_rows=partition_rows)
+        try:
+            pipeline.run()
+        finally:
+            # Metrics of a failed run show where it got to
+            if metrics_out:
+                pipeline.metrics.write(metrics_out)
         
         logger.info("✅ Conversion completed successfully!")
         
@@ -106,5 +233,137 @@ def convert(
         logger.error(f"Error: {str(e)}")
         raise typer.Exit(1)
 
+@app.command()
+def sync(
+    source: str = typer.Option(..., help=f"Source database type ({', '.join(DatabaseType.values())})"),
+    conn: str = typer.Option(..., help="Source database connection string"),
+    sqlite: str = typer.Option(..., help="Existing SQLite snapshot to refresh"),
+    schema: str = typer.Option(None, "--schema", help="Source schema to read (default: the connection's default schema)"),
+    hwm: List[str] = typer.Option([], "--hwm", help="TABLE=COLUMN high-water-mark column, e.g. orders=updated_at (defaults to an integer primary key)"),
+    tombstone: List[str] = typer.Option([], "--tombstone", help="TABLE=COLUMN soft-delete column; rows where it is true are deleted from the snapshot"),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", min=1, help="Number of rows fetched from the source and written to SQLite per batch"),
+    column_type: List[str] = typer.Option([], "--type", help="TABLE.COLUMN=TYPE SQLite type override for columns added to the snapshot"),
+    connect_arg: List[str] = typer.Option([], "--connect-arg", help="KEY=VALUE option for the database driver, e.g. read_timeout=600 (repeatable)"),
+    schema_cache: str = typer.Option(None, "--schema-cache", help="File that caches the reflected schema between runs while the source schema is unchanged"),
+    config: str = typer.Option(None, "--config", help="TOML file with include/exclude globs and per-table columns, where and sample settings"),
+    include: List[str] = typer.Option([], "--include", help="Only convert tables matching this glob (repeatable)"),
+    exclude: List[str] = typer.Option([], "--exclude", help="Skip tables matching this glob (repeatable)"),
+    columns: List[str] = typer.Option([], "--columns", help="TABLE=COL1,COL2 columns to read from a table (repeatable)"),
+    where: List[str] = typer.Option([], "--where", help="TABLE=PREDICATE SQL filter applied by the source, e.g. \"orders=created_at >= now() - interval '90 days'\""),
+    sample: List[str] = typer.Option([], "--sample", help="TABLE=PERCENT share of rows to read, sampled by the source")
+):
+    """
+    Refresh an existing SQLite snapshot with the rows changed since the last sync.
+    """
+    from dbconvert.converters.converter_factory import ConverterFactory
+    from dbconvert.core.sync import IncrementalSync
+    from dbconvert.writers.sqlite_writer import SQLiteWriter
+
+    try:
+        if source not in DatabaseType.values():
+            raise ValueError(f"Unsupported source database type: {source}")
+        if not conn:
+            raise ValueError("Connection string cannot be empty")
+
+        watermarks = parse_table_options(hwm, "--hwm")
+        tombstones = parse_table_options(tombstone, "--tombstone")
+
+        converter = ConverterFactory.create_converter(
+            source,
+            conn,
+            chunk_size=chunk_size,
+            type_overrides=parse_type_overrides(column_type),
+            connect_args=parse_connect_args(connect_arg),
+            schema_cache=schema_cache,
+            filters=build_filters(config, include, exclude, columns, where, sample),
+            schema=schema
+        )
+        writer = SQLiteWriter(sqlite)
+        results = IncrementalSync(converter, writer, watermarks, tombstones).run()
+
+        upserted = sum(result["upserted"] for result in results.values())
+        deleted = sum(result["deleted"] for result in results.values())
+        logger.info(f"✅ Sync completed: {len(results)} tables, {upserted} rows upserted, {deleted} rows deleted")
+
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise typer.Exit(1)
+
+@app.command()
+def batch(
+    manifest: str = typer.Argument(..., help="TOML manifest listing the conversions to run"),
+    concurrency: int = typer.Option(None, "--concurrency", min=1, help="Conversions running at once (default: manifest setting, else the number of CPUs)"),
+    per_host: int = typer.Option(None, "--per-host", min=1, help="Conversions running at once against one source host (default: manifest setting, else 2)")
+):
+    """
+    Run many conversions from a manifest, e.g. one per tenant database or schema, over a pool of worker processes.
+    """
+    import time
+    from dbconvert.core.batch import BatchRunner, load_manifest
+
+    try:
+        config = load_manifest(manifest)
+        runner = BatchRunner(config["jobs"], concurrency or config["concurrency"], per_host or config["per_host"])
+        logger.info(f"Running {len(runner.jobs)} conversions, {runner.concurrency} at a time and at most {runner.per_host} per source host")
+        started = time.perf_counter()
+        results = runner.run()
+        BatchRunner.log_summary(results, time.perf_counter() - started)
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise typer.Exit(1)
+    if any(result["error"] for result in results):
+        raise typer.Exit(1)
+
+@app.command()
+def verify(
+    source: str = typer.Option(..., help=f"Source database type ({', '.join(DatabaseType.values())})"),
+    conn: str = typer.Option(..., help="Source database connection string"),
+    sqlite: str = typer.Option(..., help="Converted SQLite file to check"),
+    schema: str = typer.Option(None, "--schema", help="Source schema to read (default: the connection's default schema)"),
+    workers: int = typer.Option(4, "--workers", min=1, help="Number of key ranges hashed concurrently on each side"),
+    chunk_rows: int = typer.Option(DEFAULT_VERIFY_CHUNK_ROWS, "--chunk-rows", min=1, help="Rows per primary key range compared by hash"),
+    counts_only: bool = typer.Option(False, "--counts-only", help="Only compare exact row counts"),
+    column_type: List[str] = typer.Option([], "--type", help="TABLE.COLUMN=TYPE SQLite type override used for the conversion"),
+    connect_arg: List[str] = typer.Option([], "--connect-arg", help="KEY=VALUE option for the database driver, e.g. read_timeout=600 (repeatable)"),
+    config: str = typer.Option(None, "--config", help="TOML file with include/exclude globs and per-table columns, where and sample settings"),
+    include: List[str] = typer.Option([], "--include", help="Only check tables matching this glob (repeatable)"),
+    exclude: List[str] = typer.Option([], "--exclude", help="Skip tables matching this glob (repeatable)"),
+    columns: List[str] = typer.Option([], "--columns", help="TABLE=COL1,COL2 columns read from a table (repeatable)"),
+    where: List[str] = typer.Option([], "--where", help="TABLE=PREDICATE SQL filter used for the conversion"),
+    sample: List[str] = typer.Option([], "--sample", help="TABLE=PERCENT share of rows sampled for the conversion")
+):
+    """
+    Check that a converted SQLite file matches its source, comparing hashes of primary key ranges in parallel.
+    """
+    import time
+    from dbconvert.converters.converter_factory import ConverterFactory
+    from dbconvert.core.verify import Verifier
+
+    try:
+        if source not in DatabaseType.values():
+            raise ValueError(f"Unsupported source database type: {source}")
+        if not conn:
+            raise ValueError("Connection string cannot be empty")
+        if not os.path.exists(sqlite):
+            raise ValueError(f"SQLite file not found: {sqlite}")
+
+        converter = ConverterFactory.create_converter(
+            source,
+            conn,
+            workers=workers,
+            type_overrides=parse_type_overrides(column_type),
+            connect_args=parse_connect_args(connect_arg),
+            filters=build_filters(config, include, exclude, columns, where, sample),
+            schema=schema
+        )
+        started = time.perf_counter()
+        reports = Verifier(converter, sqlite, chunk_rows=chunk_rows).run(counts_only=counts_only)
+        Verifier.log_report(reports, time.perf_counter() - started)
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise typer.Exit(1)
+    if not all(report["ok"] for report in reports.values()):
+        raise typer.Exit(1)
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
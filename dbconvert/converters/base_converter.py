@@ -1,40 +1,526 @@
+import datetime
+import decimal
+import hashlib
+import json
+import math
+import uuid
 from sqlalchemy import create_engine, inspect, text
-from typing import Dict, Any
+from sqlalchemy.engine import Connection
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from dbconvert.converters.schema_cache import SchemaCache
+from dbconvert.core.defaults import DEFAULT_CHUNK_SIZE, DEFAULT_LARGE_OBJECT_PIECE_BYTES, DEFAULT_PARTITION_ROWS
+from dbconvert.core.filters import SourceFilters
+from dbconvert.core.large_objects import LargeObject
 from dbconvert.core.loggingsetup import LoggerManager
 
 logger = LoggerManager.get_logger()
 
+# Primary key types that can be split into key ranges
+ORDERED_KEY_TYPES = (int, str, datetime.date, datetime.datetime)
+
+# A key range of a table: inclusive lower and exclusive upper bound, None when unbounded
+Partition = Tuple[Any, Any]
+
+# Column types that can be forced with `type_overrides`
+SQLITE_TYPES = ("INTEGER", "REAL", "TEXT", "BLOB", "NUMERIC", "BOOLEAN")
+
+# Converts one non-NULL driver value into a value sqlite3 can store
+ValueConverter = Callable[[Any], Any]
+
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _skip_none(convert: ValueConverter) -> ValueConverter:
+    def converter(value):
+        return None if value is None else convert(value)
+    return converter
+
 class BaseConverter:
-    def __init__(self, conn_str: str):
-        self.engine = create_engine(conn_str)
+    # Driver connection options that suit bulk reads, overridable with `connect_args`
+    default_connect_args: Dict[str, Any] = {}
+    # Catalog queries whose combined result changes whenever the schema does, see `schema_fingerprint`
+    schema_fingerprint_queries: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        conn_str: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        type_overrides: Optional[Dict[str, str]] = None,
+        connect_args: Optional[Dict[str, Any]] = None,
+        schema_cache: Optional[str] = None,
+        filters: Optional[SourceFilters] = None,
+        schema: Optional[str] = None,
+        large_object_threshold: Optional[int] = None,
+    ):
+        """Connect to the source database.
+
+        `type_overrides` maps "table.column" to one of `SQLITE_TYPES`, replacing
+        the type that `map_column_type` would pick for that column.
+        `connect_args` are passed to the DB-API driver's `connect()` on top of
+        `default_connect_args`. With `schema_cache`, reflected metadata is kept
+        in that file and reused while the schema fingerprint is unchanged.
+        `filters` selects the tables, columns and rows that are read.
+        `schema` is the source schema to convert, the connection's default
+        schema if None. With `large_object_threshold`, binary values larger
+        than that many bytes are left out of the table reads and replaced with
+        `LargeObject` placeholders, to be read in pieces with
+        `iter_large_object`.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer")
+        if workers <= 0:
+            raise ValueError("Number of workers must be a positive integer")
+        # One pooled connection per worker, plus one for schema reflection
+        self.connect_args = {**self.default_connect_args, **(connect_args or {})}
+        self.engine = create_engine(conn_str, pool_size=workers + 1, max_overflow=2, connect_args=self.connect_args)
         self.inspector = inspect(self.engine)
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.schema = schema
+        self.large_object_threshold = large_object_threshold
+        self.large_object_piece_bytes = DEFAULT_LARGE_OBJECT_PIECE_BYTES
+        self.schema_cache = SchemaCache(schema_cache) if schema_cache else None
+        self.filters = filters or SourceFilters()
+        # Projection, predicates and sampling of each reflected table, see `plan_source_filters`
+        self.source_filters: Dict[str, Dict[str, Any]] = {}
+        self.type_overrides = {}
+        for column, sqlite_type in (type_overrides or {}).items():
+            if sqlite_type.upper() not in SQLITE_TYPES:
+                raise ValueError(f"Unsupported SQLite type for {column}: {sqlite_type} (expected one of {', '.join(SQLITE_TYPES)})")
+            self.type_overrides[column] = sqlite_type.upper()
+
+    def get_table_names(self) -> List[str]:
+        """Return the source tables selected by the include and exclude filters."""
+        return self.filters.select_tables(self.inspector.get_table_names(schema=self.schema))
+
+    def get_table_metadata(self, table_name: str) -> Dict[str, Any]:
+        """Reflect the columns, keys, indexes and unique constraints of a table.
+
+        Every column also gets its SQLite type (`sqlite_type`), and `converters`
+        lists the (column index, converter) pairs that `convert_batch` applies.
+        """
+        return self.reflect_tables([table_name])[table_name]
+
+    def reflect_tables(self, table_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Reflect many tables at once, in the order given (all selected tables by default).
+
+        Each kind of catalog object is fetched for all tables in one
+        `get_multi_*` call instead of one query per table. With a schema cache,
+        the reflection is skipped entirely while the schema is unchanged. The
+        returned metadata has the same layout as `get_table_metadata`, limited
+        to the projected columns.
+        """
+        if table_names is None:
+            table_names = self.get_table_names()
+
+        cache_key = None
+        reflected = {}
+        if self.schema_cache is not None:
+            fingerprint = self.schema_fingerprint()
+            if fingerprint is None:
+                logger.warning("Schema fingerprints are not supported for this database; the schema cache is not used")
+            else:
+                cache_key = SchemaCache.make_key(self.engine.url.render_as_string(hide_password=True), fingerprint, self.schema)
+                reflected = self.schema_cache.load(cache_key) or {}
+
+        missing = [table_name for table_name in table_names if table_name not in reflected]
+        if missing:
+            reflected.update(self.reflect_multi(missing))
+            if cache_key is not None:
+                self.schema_cache.save(cache_key, reflected)
+        elif cache_key is not None:
+            logger.info(f"Loaded the schema of {len(table_names)} tables from the schema cache")
 
-    def read_all_tables(self) -> Dict[str, Dict[str, Any]]:
-        """Read all tables and their data from the source database."""
         tables = {}
+        for table_name in table_names:
+            # Projection and type resolution are not part of the cached reflection
+            meta = self.filters.project(table_name, reflected[table_name])
+            self.resolve_types(table_name, meta)
+            meta["large_objects"] = self.plan_large_objects(table_name, meta)
+            self.source_filters[table_name] = self.plan_source_filters(table_name, meta)
+            tables[table_name] = meta
+        return tables
+
+    def reflect_multi(self, table_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Reflect the given tables with one `get_multi_*` call per kind of catalog object."""
+        reflections = {
+            "columns": self.inspector.get_multi_columns(schema=self.schema, filter_names=table_names),
+            "primary_keys": self.inspector.get_multi_pk_constraint(schema=self.schema, filter_names=table_names),
+            "foreign_keys": self.inspector.get_multi_foreign_keys(schema=self.schema, filter_names=table_names),
+            "indexes": self.inspector.get_multi_indexes(schema=self.schema, filter_names=table_names),
+            "unique_constraints": self.inspector.get_multi_unique_constraints(schema=self.schema, filter_names=table_names),
+        }
+        tables = {}
+        for table_name in table_names:
+            # Results are keyed by (schema, table); the default schema is None
+            tables[table_name] = {kind: result[(self.schema, table_name)] for kind, result in reflections.items()}
+        return tables
+
+    def schema_fingerprint(self) -> Optional[str]:
+        """Return a hash of the catalog that changes whenever a table, column, key or index does.
+
+        Computed from `schema_fingerprint_queries`, which receive the source
+        schema as the `:schema` parameter; None when the converter defines none.
+        """
+        if not self.schema_fingerprint_queries:
+            return None
+        digest = hashlib.sha256()
+        with self.engine.connect() as conn:
+            for query in self.schema_fingerprint_queries:
+                for row in conn.execute(text(query), {"schema": self.schema}):
+                    digest.update(repr(tuple(row)).encode())
+                digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def resolve_types(self, table_name: str, meta: Dict[str, Any]):
+        """Resolve the SQLite type and value converter of every column, once per table."""
+        converters = []
+        for index, col in enumerate(meta["columns"]):
+            sqlite_type = self.type_overrides.get(f"{table_name}.{col['name']}") or self.map_column_type(col["type"])
+            col["sqlite_type"] = sqlite_type
+            convert = self.get_value_converter(col, sqlite_type)
+            if convert is not None:
+                converters.append((index, _skip_none(convert)))
+        meta["converters"] = converters
+
+    def get_value_converter(self, col: Dict[str, Any], sqlite_type: str) -> Optional[ValueConverter]:
+        """Return the function that makes a column's driver values storable in SQLite.
+
+        None means the values can be stored as they are. The choice is made from
+        the reflected column type, not from the values themselves.
+        """
+        try:
+            python_type = col["type"].python_type
+        except NotImplementedError:
+            return None
+
+        if python_type in (dict, list):
+            return to_json
+        if python_type is bytes:
+            # bytes and memoryview values are stored by sqlite3 as they are, without a copy
+            return None
+        if sqlite_type == "TEXT":
+            return None if python_type in (str, bytes) else str
+        if sqlite_type == "INTEGER" and python_type in (decimal.Decimal, float):
+            return int
+        if sqlite_type == "REAL" and python_type is decimal.Decimal:
+            return float
+        if sqlite_type == "NUMERIC" and python_type is decimal.Decimal:
+            # SQLite stores the text as a number when it can do so without losing precision
+            return str
+        if python_type in (datetime.datetime, datetime.date, datetime.time, datetime.timedelta, uuid.UUID, decimal.Decimal):
+            return str
+        return None
+
+    def convert_batch(self, meta: Dict[str, Any], rows) -> List[Any]:
+        """Apply the table's value converters to a batch of rows, one column at a time."""
+        if meta.get("large_objects") and rows:
+            rows = self.extract_large_objects(meta, rows)
+        converters = meta.get("converters")
+        if not converters or not rows:
+            return rows
+        columns = list(zip(*rows))
+        for index, convert in converters:
+            columns[index] = list(map(convert, columns[index]))
+        return list(zip(*columns))
+
+    def plan_large_objects(self, table_name: str, meta: Dict[str, Any]) -> List[Tuple[int, str]]:
+        """Return (index, name) of the BLOB columns whose large values are read in pieces.
+
+        Pieces are read by primary key, so only tables with a single-column
+        primary key qualify.
+        """
+        if not self.large_object_threshold:
+            return []
+        blob_columns = [(index, col["name"]) for index, col in enumerate(meta["columns"]) if col.get("sqlite_type") == "BLOB"]
+        if not blob_columns:
+            return []
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        if len(pk_columns) != 1:
+            logger.warning(f"Table {table_name} has no single-column primary key; its BLOB values are read whole")
+            return []
+        return blob_columns
+
+    def extract_large_objects(self, meta: Dict[str, Any], rows) -> List[Any]:
+        """Replace the large values of a batch with `LargeObject` placeholders.
+
+        The SELECT built by `build_select` returns NULL in place of a large
+        value and its length in a trailing column; those columns are removed.
+        """
+        width = len(meta["columns"])
+        pk_column = meta["primary_keys"]["constrained_columns"][0]
+        key_index = [col["name"] for col in meta["columns"]].index(pk_column)
+        extracted = []
+        for row in rows:
+            lengths = row[width:]
+            row = row[:width]
+            if any(length is not None for length in lengths):
+                row = list(row)
+                for (index, name), length in zip(meta["large_objects"], lengths):
+                    if length is not None:
+                        row[index] = LargeObject(name, row[key_index], int(length))
+                row = tuple(row)
+            extracted.append(row)
+        return extracted
+
+    def iter_large_object(self, conn, table_name: str, meta: Dict[str, Any], large_object: LargeObject) -> Iterator[Any]:
+        """Yield the bytes of a large value in pieces of `large_object_piece_bytes`.
+
+        Each piece is a separate `substr` query on the reader's connection, so
+        it comes from the same snapshot as the rest of the row.
+        """
+        pk_column = meta["primary_keys"]["constrained_columns"][0]
+        query = text(
+            f"SELECT substr({self.quote(large_object.column)}, :start, :size) FROM {self.table_ref(table_name)} "
+            f"WHERE {self.quote(pk_column)} = :key"
+        )
+        offset = 0
+        while offset < large_object.length:
+            size = min(self.large_object_piece_bytes, large_object.length - offset)
+            piece = conn.execute(query, {"start": offset + 1, "size": size, "key": large_object.key}).scalar()
+            if not piece:
+                break
+            yield piece
+            offset += len(piece)
+        if offset != large_object.length:
+            raise ValueError(
+                f"Value of {table_name}.{large_object.column} for key {large_object.key!r} changed while it was read "
+                f"({offset} of {large_object.length} bytes)"
+            )
+
+    def begin_snapshot(self, conns: List[Connection]):
+        """Start transactions on `conns` that all read the same snapshot of the database.
+
+        Called on freshly opened connections before any data is read. The base
+        implementation has no way to share a snapshot, so each connection
+        simply reads the latest committed data.
+        """
+        if len(conns) > 1:
+            logger.warning("Consistent snapshots are not supported for this database; workers read independently")
+
+    def quote(self, identifier: str) -> str:
+        """Quote a table or column name for the source dialect."""
+        return self.engine.dialect.identifier_preparer.quote(identifier)
+
+    def table_ref(self, table_name: str) -> str:
+        """Quote a table name for use in a query, qualified with the source schema if one is set."""
+        if self.schema:
+            return f"{self.quote(self.schema)}.{self.quote(table_name)}"
+        return self.quote(table_name)
+
+    def plan_source_filters(self, table_name: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate a table's filters into the pieces of its SELECT statement.
+
+        Returns the projected column names (None for all columns), the WHERE
+        clauses, the sampling clause that follows the table name and the
+        columns whose large values are left out (see `plan_large_objects`).
+        """
+        plan = {"columns": None, "where": [], "table_sample": "", "large_objects": [name for _, name in meta.get("large_objects", [])]}
+        if table_name in self.filters.columns or meta.get("large_objects"):
+            plan["columns"] = [col["name"] for col in meta["columns"]]
+        if table_name in self.filters.where:
+            plan["where"].append(self.filters.where[table_name])
+        if table_name in self.filters.sample:
+            table_sample, where = self.sample_filter(table_name, meta, self.filters.sample[table_name])
+            plan["table_sample"] = table_sample
+            plan["where"].extend(where)
+        return plan
+
+    def sample_filter(self, table_name: str, meta: Dict[str, Any], percent: float) -> Tuple[str, List[str]]:
+        """Return the sampling clause and WHERE clauses that keep about `percent` % of a table's rows.
+
+        The base implementation keeps the rows whose integer primary key is a
+        multiple of round(100 / percent), which is deterministic across
+        partitions and resumed runs.
+        """
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        integer_key = False
+        if len(pk_columns) == 1:
+            for col in meta["columns"]:
+                if col["name"] == pk_columns[0]:
+                    try:
+                        integer_key = issubclass(col["type"].python_type, int)
+                    except NotImplementedError:
+                        integer_key = False
+        if not integer_key:
+            raise ValueError(f"Cannot sample table {table_name}: sampling needs a single-column integer primary key")
+        modulus = max(1, round(100 / percent))
+        return "", [f"{self.quote(pk_columns[0])} % {modulus} = 0"]
+
+    def build_select(self, table_name: str, where: Optional[List[str]] = None, order_by: Optional[List[str]] = None) -> str:
+        """Build the SELECT statement used to read a table, with its source filters applied."""
+        plan = self.source_filters.get(table_name) or {}
+        columns = plan.get("columns")
+        select_list = ", ".join(self.quote(col) for col in columns) if columns else "*"
+        if plan.get("large_objects"):
+            select_list = self.large_object_select_list(columns, plan["large_objects"])
+        sql = f"SELECT {select_list} FROM {self.table_ref(table_name)}"
+        if plan.get("table_sample"):
+            sql += f" {plan['table_sample']}"
+        where = list(plan.get("where") or []) + list(where or [])
+        if where:
+            sql += " WHERE " + " AND ".join(f"({clause})" for clause in where)
+        if order_by:
+            sql += " ORDER BY " + ", ".join(self.quote(col) for col in order_by)
+        return sql
+
+    def large_object_select_list(self, columns: List[str], large_objects: List[str]) -> str:
+        """Select NULL instead of values above the large-object threshold, and their lengths at the end."""
+        threshold = int(self.large_object_threshold)
+        select_list, lengths = [], []
+        for name in columns:
+            col = self.quote(name)
+            if name in large_objects:
+                select_list.append(f"CASE WHEN length({col}) > {threshold} THEN NULL ELSE {col} END AS {col}")
+                lengths.append(f"CASE WHEN length({col}) > {threshold} THEN length({col}) END")
+            else:
+                select_list.append(col)
+        return ", ".join(select_list + lengths)
+
+    def iter_table_chunks(
+        self,
+        conn,
+        table_name: str,
+        where: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> Iterator[List[Any]]:
+        """Yield the rows of a table in batches of at most `chunk_size` rows.
+
+        A server-side cursor is used, so only one batch is held in memory at a time.
+        """
+        result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(
+            text(self.build_select(table_name, where, order_by)), params or {}
+        )
+        for chunk in result.partitions(self.chunk_size):
+            yield chunk
+
+    def estimate_row_count(self, conn, table_name: str) -> int:
+        """Return the (possibly approximate) number of rows in a table."""
+        return conn.execute(text(f"SELECT COUNT(*) FROM {self.table_ref(table_name)}")).scalar() or 0
+
+    def estimate_row_counts(self, conn, table_names: List[str]) -> Dict[str, int]:
+        """Return the (possibly approximate) number of rows of several tables."""
+        return {table_name: self.estimate_row_count(conn, table_name) for table_name in table_names}
+
+    def get_partition_column(self, meta: Dict[str, Any]) -> Optional[str]:
+        """Return the single-column primary key a table can be range-split on, if any."""
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        if len(pk_columns) != 1:
+            return None
+        for col in meta["columns"]:
+            if col["name"] == pk_columns[0]:
+                try:
+                    python_type = col["type"].python_type
+                except NotImplementedError:
+                    return None
+                return col["name"] if issubclass(python_type, ORDERED_KEY_TYPES) else None
+        return None
+
+    def get_partition_boundaries(self, conn, table_name: str, column: str, partitions: int, row_estimate: int) -> List[Any]:
+        """Return up to `partitions - 1` ascending key values that split a table into even ranges.
+
+        Integer keys are split arithmetically between MIN and MAX. Other ordered
+        keys use quantiles probed through the primary key index.
+        """
+        table, col = self.table_ref(table_name), self.quote(column)
+        low, high = conn.execute(text(f"SELECT MIN({col}), MAX({col}) FROM {table}")).one()
+        if low is None:
+            return []
+
+        if isinstance(low, int):
+            step = math.ceil((high - low + 1) / partitions)
+            return [low + step * i for i in range(1, partitions) if low + step * i <= high]
+
+        boundaries = []
+        query = text(f"SELECT {col} FROM {table} ORDER BY {col} LIMIT 1 OFFSET :offset")
+        for i in range(1, partitions):
+            value = conn.execute(query, {"offset": row_estimate * i // partitions}).scalar()
+            if value is not None and (not boundaries or value > boundaries[-1]):
+                boundaries.append(value)
+        return boundaries
+
+    def plan_partitions(
+        self,
+        conn,
+        table_name: str,
+        meta: Dict[str, Any],
+        partition_rows: int = DEFAULT_PARTITION_ROWS,
+        max_partitions: Optional[int] = None,
+    ) -> List[Partition]:
+        """Split a large table into primary key ranges that can be read concurrently.
+
+        Tables smaller than `partition_rows`, or without a single ordered primary
+        key, are returned as one partition covering the whole table. Use
+        `partition_where` to turn a partition into a query filter.
+        """
+        whole_table = [(None, None)]
+        max_partitions = max_partitions or self.workers
+        if max_partitions <= 1 or partition_rows <= 0:
+            return whole_table
+
+        column = self.get_partition_column(meta)
+        if column is None:
+            return whole_table
+
+        row_estimate = self.estimate_row_count(conn, table_name)
+        partitions = min(max_partitions, math.ceil(row_estimate / partition_rows))
+        if partitions <= 1:
+            return whole_table
+
+        boundaries = self.get_partition_boundaries(conn, table_name, column, partitions, row_estimate)
+        if not boundaries:
+            return whole_table
+
+        bounds = [None] + boundaries + [None]
+        return list(zip(bounds, bounds[1:]))
+
+    def partition_where(
+        self, column: Optional[str], partition: Partition, after: Any = None
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """Build the WHERE clauses and bind parameters that select one key range.
+
+        With `after`, only rows whose key is greater than `after` are selected,
+        which is how an interrupted partition is resumed.
+        """
+        where, params = [], {}
+        if column is None:
+            return where, params
+        col = self.quote(column)
+        low, high = partition
+        if low is not None:
+            where.append(f"{col} >= :key_low")
+            params["key_low"] = low
+        if high is not None:
+            where.append(f"{col} < :key_high")
+            params["key_high"] = high
+        if after is not None:
+            where.append(f"{col} > :key_after")
+            params["key_after"] = after
+        return where, params
+
+    def stream_all_tables(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield each table with its metadata and a lazy iterator over its row batches.
+
+        The batches of a table must be consumed before advancing to the next table.
+        """
+        tables = self.reflect_tables()
         with self.engine.connect() as conn:
-            for table_name in self.inspector.get_table_names():
+            for table_name, meta in tables.items():
                 logger.info(f"Reading table: {table_name}")
-                
-                # Get column information
-                columns = self.inspector.get_columns(table_name)
-                
-                # Get primary keys
-                primary_keys = self.inspector.get_pk_constraint(table_name)
-                
-                # Get foreign keys
-                foreign_keys = self.inspector.get_foreign_keys(table_name)
-                
-                # Get table data
-                data = conn.execute(text(f"SELECT * FROM {table_name}")).fetchall()
-                
-                tables[table_name] = {
-                    "columns": columns,
-                    "primary_keys": primary_keys,
-                    "foreign_keys": foreign_keys,
-                    "data": data
-                }
-                
+                meta["chunks"] = (self.convert_batch(meta, chunk) for chunk in self.iter_table_chunks(conn, table_name))
+                yield table_name, meta
+
+    def read_all_tables(self) -> Dict[str, Dict[str, Any]]:
+        """Read all tables and their data from the source database."""
+        tables = {}
+        for table_name, meta in self.stream_all_tables():
+            chunks = meta.pop("chunks")
+            meta["data"] = [row for chunk in chunks for row in chunk]
+            tables[table_name] = meta
         return tables
 
     def map_column_type(self, col_type: str) -> str:
@@ -47,9 +533,11 @@ class BaseConverter:
             return "TEXT"
         elif "bool" in type_str:
             return "BOOLEAN"
-        elif "float" in type_str or "double" in type_str or "numeric" in type_str:
+        elif "float" in type_str or "double" in type_str or "numeric" in type_str or "decimal" in type_str or "real" in type_str:
             return "REAL"
         elif "date" in type_str or "time" in type_str:
             return "TEXT"  # SQLite doesn't have native date/time types
+        elif "blob" in type_str or "binary" in type_str:
+            return "BLOB"
         else:
             return "TEXT"  # Default to TEXT for unknown types 
\ No newline at end of file
@@ -1,22 +1,31 @@
-from typing import Optional
-from dbconvert.converters.base_converter import BaseConverter
-from dbconvert.converters.postgres_converter import PostgresConverter
-from dbconvert.converters.mysql_converter import MySQLConverter
+import importlib
+from typing import Any, Optional, TYPE_CHECKING
 from dbconvert.core.enums import DatabaseType
 from dbconvert.core.loggingsetup import LoggerManager
 
+if TYPE_CHECKING:
+    from dbconvert.converters.base_converter import BaseConverter
+
 logger = LoggerManager.get_logger()
 
 class ConverterFactory:
+    # Converter classes by "module:class" path, imported on first use so that
+    # only the driver of the selected database is ever loaded
     registry = {
-        DatabaseType.POSTGRES.value: PostgresConverter,
-        DatabaseType.MYSQL.value: MySQLConverter
+        DatabaseType.POSTGRES.value: "dbconvert.converters.postgres_converter:PostgresConverter",
+        DatabaseType.MYSQL.value: "dbconvert.converters.mysql_converter:MySQLConverter"
     }
     
     @staticmethod
-    def create_converter(db_type: str, conn_str: str) -> Optional[BaseConverter]:
-        converter_cls = ConverterFactory.registry.get(db_type)
-        if not converter_cls:
+    def get_converter_class(db_type: str) -> type:
+        path = ConverterFactory.registry.get(db_type)
+        if not path:
             logger.error(f"Unsupported database type: {db_type}")
-            raise ValueError(f"Unsupported database type: {db_type}") 
-        return converter_cls(conn_str)
\ No newline at end of file
+            raise ValueError(f"Unsupported database type: {db_type}")
+        module_name, _, class_name = path.partition(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    @staticmethod
+    def create_converter(db_type: str, conn_str: str, **options: Any) -> Optional["BaseConverter"]:
+        converter_cls = ConverterFactory.get_converter_class(db_type)
+        return converter_cls(conn_str, **options)
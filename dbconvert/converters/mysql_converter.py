@@ -1,6 +1,144 @@
-from dbconvert.converters.base_converter import BaseConverter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from pymysql.cursors import SSCursor
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from dbconvert.converters.base_converter import BaseConverter, ValueConverter
+from dbconvert.core.loggingsetup import LoggerManager
+
+logger = LoggerManager.get_logger()
+
+def bit_to_int(value) -> int:
+    return value if isinstance(value, int) else int.from_bytes(value, "big")
 
 class MySQLConverter(BaseConverter):
+    default_connect_args = {
+        # Readers that are held back by a slow writer must not make the server drop the stream
+        "init_command": "SET SESSION net_write_timeout = 3600",
+    }
+    schema_fingerprint_queries = (
+        "SELECT TABLE_NAME, ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA "
+        "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE()) ORDER BY 1, 2",
+        "SELECT TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME, NON_UNIQUE "
+        "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE()) ORDER BY 1, 2, 3",
+        "SELECT TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+        "FROM information_schema.KEY_COLUMN_USAGE WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE()) ORDER BY 1, 2, 3",
+    )
+
+    def begin_snapshot(self, conns: List[Connection]):
+        """Start a consistent-snapshot transaction on every connection.
+
+        InnoDB snapshots cannot be shared between sessions, so the snapshots
+        are taken while a global read lock briefly blocks writes, which makes
+        them identical. Without the RELOAD privilege the lock is skipped and
+        the snapshots may differ by transactions committed in between.
+        """
+        locked = False
+        if len(conns) > 1:
+            try:
+                conns[0].execute(text("FLUSH TABLES WITH READ LOCK"))
+                locked = True
+            except DBAPIError as e:
+                logger.warning(f"Could not take a global read lock, worker snapshots may differ slightly: {str(e)}")
+
+        try:
+            for conn in conns:
+                conn.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+                conn.execute(text("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY"))
+        finally:
+            if locked:
+                conns[0].execute(text("UNLOCK TABLES"))
+
+    def compile_select(
+        self,
+        table_name: str,
+        where: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> Tuple[str, Union[Tuple[Any, ...], Dict[str, Any]]]:
+        """Compile a table's SELECT for PyMySQL, returning the SQL and the arguments to execute it with.
+
+        The statement is rendered in the engine's paramstyle. With a positional
+        style such as "format", named parameters like `:key_low` become `%s`
+        placeholders and their values are passed as a tuple, in the order they
+        appear in the statement.
+        """
+        compiled = text(self.build_select(table_name, where, order_by)).compile(dialect=self.engine.dialect)
+        values = compiled.construct_params(params or {})
+        if compiled.positional:
+            return str(compiled), tuple(values[name] for name in compiled.positiontup)
+        return str(compiled), values
+
+    def iter_table_chunks(
+        self,
+        conn,
+        table_name: str,
+        where: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> Iterator[List[Any]]:
+        """Yield the rows of a table in batches from an unbuffered PyMySQL cursor.
+
+        `SSCursor` reads rows off the socket as they are fetched instead of
+        buffering the whole result, and `fetchmany` returns plain tuples without
+        building SQLAlchemy rows. The query runs on the connection's own
+        transaction, so it reads the snapshot started by `begin_snapshot`.
+        """
+        select, args = self.compile_select(table_name, where, params, order_by)
+        cursor = conn.connection.dbapi_connection.cursor(SSCursor)
+        finished = False
+        try:
+            cursor.execute(select, args)
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # Closing an unbuffered cursor reads the rest of the result, drop the connection instead
+                conn.invalidate()
+
+    def estimate_row_count(self, conn, table_name: str) -> int:
+        """Use InnoDB's row estimate instead of a full COUNT(*)."""
+        estimate = conn.execute(
+            text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE()) AND TABLE_NAME = :name"
+            ),
+            {"name": table_name, "schema": self.schema}
+        ).scalar()
+        if estimate is None:
+            return super().estimate_row_count(conn, table_name)
+        return estimate
+
+    def estimate_row_counts(self, conn, table_names: List[str]) -> Dict[str, int]:
+        """Read InnoDB's row estimates of all tables in one query."""
+        rows = conn.execute(
+            text("SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = COALESCE(:schema, DATABASE())"),
+            {"schema": self.schema}
+        ).all()
+        estimates = {name: estimate for name, estimate in rows if name in table_names and estimate is not None}
+        for table_name in table_names:
+            if table_name not in estimates:
+                estimates[table_name] = self.estimate_row_count(conn, table_name)
+        return estimates
+
+    def sample_filter(self, table_name: str, meta: Dict[str, Any], percent: float) -> Tuple[str, List[str]]:
+        """Sample on the primary key: modulo for integer keys, a CRC32 hash bucket for any other key."""
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        if not pk_columns:
+            raise ValueError(f"Cannot sample table {table_name}: sampling needs a primary key")
+        try:
+            return super().sample_filter(table_name, meta, percent)
+        except ValueError:
+            key = ", ".join(self.quote(col) for col in pk_columns)
+            return "", [f"CRC32(CONCAT_WS(0x1f, {key})) % 10000 < {round(percent * 100)}"]
+
     def map_column_type(self, col_type: str) -> str:
         """Override type mapping for MySQL-specific types."""
         type_str = str(col_type).lower()
@@ -11,9 +149,19 @@ class MySQLConverter(BaseConverter):
         elif "year" in type_str:
             return "INTEGER"  # Store YEAR as INTEGER in SQLite
         elif "bit" in type_str:
-            return "BLOB"  # Store BIT as BLOB in SQLite
+            return "INTEGER"  # Store BIT as INTEGER in SQLite
         elif "geometry" in type_str or "point" in type_str:
             return "BLOB"  # Store spatial types as BLOB in SQLite
             
         # Use base class mapping for other types
-        return super().map_column_type(col_type) 
\ No newline at end of file
+        return super().map_column_type(col_type)
+
+    def get_value_converter(self, col: Dict[str, Any], sqlite_type: str) -> Optional[ValueConverter]:
+        """Handle values that PyMySQL returns in MySQL-specific forms."""
+        if isinstance(col["type"], mysql.BIT):
+            # PyMySQL returns BIT values as big-endian bytes
+            return bit_to_int if sqlite_type in ("INTEGER", "NUMERIC", "BOOLEAN") else None
+        if isinstance(col["type"], mysql.JSON):
+            # JSON documents already arrive as text
+            return None
+        return super().get_value_converter(col, sqlite_type) 
\ No newline at end of file
@@ -1,6 +1,264 @@
-from dbconvert.converters.base_converter import BaseConverter
+import io
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import psycopg2
+from psycopg2.extensions import encodings as pg_encodings, string_types as pg_string_types
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+from dbconvert.converters.base_converter import BaseConverter, ValueConverter, to_json
+from dbconvert.core.loggingsetup import LoggerManager
+
+logger = LoggerManager.get_logger()
+
+# Backslash escapes of the COPY text format
+_COPY_ESCAPE = re.compile(r"\\(x[0-9a-fA-F]{1,2}|[0-7]{1,3}|.)")
+_COPY_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+_COPY_NULL = "\\N"
+
+
+def _unescape(match) -> str:
+    escape = match.group(1)
+    if escape[0] == "x" and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    if escape[0] in "01234567":
+        return chr(int(escape, 8))
+    return _COPY_ESCAPES.get(escape, escape)
+
+
+# Types whose COPY text is converted by a builtin, exactly as psycopg2's typecaster would:
+# bool, int8, int2, int4, oid, float4 and float8, whose text never holds escapes,
+# and the text types char, name, text, bpchar and varchar, which need no cast
+_COPY_BUILTIN_CASTS: Dict[int, Optional[Callable[[str], Any]]] = {
+    16: "t".__eq__, 20: int, 21: int, 23: int, 26: int, 700: float, 701: float,
+    18: None, 19: None, 25: None, 1042: None, 1043: None,
+}
+
+
+def _unescape_field(field: str) -> str:
+    return _COPY_ESCAPE.sub(_unescape, field) if "\\" in field else field
+
+
+def copy_column_decoder(dbapi_conn, cast_cursor, type_code: int) -> Callable[[Iterable[str]], List[Any]]:
+    """Return a function that turns one column of COPY text fields into the values a SELECT would return.
+
+    The conversion is resolved once per column: a builtin for common scalar
+    types, otherwise psycopg2's typecaster for the column type (one registered
+    on the connection first), so both read paths produce the same Python
+    values. `cast_cursor` must not be the cursor running the COPY.
+    """
+    if type_code in _COPY_BUILTIN_CASTS and type_code not in dbapi_conn.string_types:
+        cast = _COPY_BUILTIN_CASTS[type_code]
+        if cast is None:
+            return lambda fields: [None if field == _COPY_NULL else _unescape_field(field) for field in fields]
+        return lambda fields: [None if field == _COPY_NULL else cast(field) for field in fields]
+
+    typecaster = dbapi_conn.string_types.get(type_code) or pg_string_types.get(type_code)
+    if typecaster is None:
+        # psycopg2 returns values of unknown types as text
+        return copy_column_decoder(dbapi_conn, cast_cursor, 25)
+
+    def decode(fields):
+        return [None if field == _COPY_NULL else typecaster(_unescape_field(field), cast_cursor) for field in fields]
+
+    if type_code == psycopg2.BINARY:
+        def decode_binary(fields):
+            # bytea in hex output format arrives as an escaped backslash, "x" and hex digits
+            return [
+                None if field == _COPY_NULL
+                else bytes.fromhex(field[3:]) if field.startswith("\\\\x")
+                else bytes(typecaster(_unescape_field(field), cast_cursor))
+                for field in fields
+            ]
+        return decode_binary
+    return decode
+
 
 class PostgresConverter(BaseConverter):
+    schema_fingerprint_queries = (
+        "SELECT c.relname, a.attnum, a.attname, format_type(a.atttypid, a.atttypmod), a.attnotnull, "
+        "pg_get_expr(d.adbin, d.adrelid) "
+        "FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+        "WHERE n.nspname = COALESCE(CAST(:schema AS text), current_schema()) AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped "
+        "ORDER BY 1, 2",
+        "SELECT c.relname, con.conname, pg_get_constraintdef(con.oid) "
+        "FROM pg_constraint con JOIN pg_class c ON c.oid = con.conrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = COALESCE(CAST(:schema AS text), current_schema()) ORDER BY 1, 2",
+        "SELECT tablename, indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = COALESCE(CAST(:schema AS text), current_schema()) ORDER BY 1, 2",
+    )
+
+    def __init__(self, conn_str: str, *args, use_copy: bool = False, **kwargs):
+        """Connect to PostgreSQL.
+
+        With `use_copy`, tables are read with `COPY (SELECT ...) TO STDOUT`
+        instead of a server-side cursor (see `iter_copy_chunks`).
+        """
+        super().__init__(conn_str, *args, **kwargs)
+        self.use_copy = use_copy
+
+    def begin_snapshot(self, conns: List[Connection]):
+        """Share one REPEATABLE READ snapshot across all connections.
+
+        The first connection exports its snapshot with `pg_export_snapshot()`
+        and every other connection imports it, so all workers see exactly the
+        same data.
+        """
+        for conn in conns:
+            conn.execution_options(isolation_level="REPEATABLE READ")
+
+        snapshot_id = conns[0].execute(text("SELECT pg_export_snapshot()")).scalar()
+        for conn in conns[1:]:
+            conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+        logger.info(f"Reading from snapshot {snapshot_id} on {len(conns)} connection(s)")
+
+    def iter_table_chunks(
+        self,
+        conn,
+        table_name: str,
+        where: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> Iterator[List[Any]]:
+        if self.use_copy:
+            return self.iter_copy_chunks(conn, table_name, where, params, order_by)
+        return super().iter_table_chunks(conn, table_name, where, params, order_by)
+
+    def iter_copy_chunks(
+        self,
+        conn,
+        table_name: str,
+        where: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> Iterator[List[Any]]:
+        """Yield the rows of a table in batches, read with COPY in text format.
+
+        `copy_expert` runs in a helper thread and writes into an OS pipe that
+        is split into fields line by line here and decoded one column at a
+        time per batch, so at most one batch plus the pipe buffer is held in
+        memory. The COPY runs on the same connection, and so in the same
+        snapshot, as the SELECT path would, but on its own cursor: the cursor
+        that described the columns is used for casting values meanwhile.
+        """
+        dbapi_conn = conn.connection.dbapi_connection
+        cursor = dbapi_conn.cursor()
+        # COPY takes no bind parameters, so they are interpolated client side
+        select = str(text(self.build_select(table_name, where, order_by)).compile(dialect=self.engine.dialect))
+        select = cursor.mogrify(select, params or {}).decode(pg_encodings[dbapi_conn.encoding])
+
+        # An empty result still describes its columns, which gives the type of every field
+        cursor.execute(f"SELECT * FROM ({select}) AS copy_source LIMIT 0")
+        decoders = [copy_column_decoder(dbapi_conn, cursor, column.type_code) for column in cursor.description]
+        copy_cursor = dbapi_conn.cursor()
+
+        def decode(lines: List[List[str]]) -> List[Any]:
+            columns = [decode_column(fields) for decode_column, fields in zip(decoders, zip(*lines))]
+            return list(zip(*columns))
+
+        read_fd, write_fd = os.pipe()
+        source = io.open(read_fd, "r", encoding=pg_encodings[dbapi_conn.encoding], newline="\n")
+        sink = io.open(write_fd, "wb")
+        errors = []
+
+        def copy():
+            try:
+                copy_cursor.copy_expert(f"COPY ({select}) TO STDOUT", sink)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                try:
+                    sink.close()
+                except OSError:
+                    # The reading side is already closed
+                    pass
+
+        thread = threading.Thread(target=copy, name=f"dbconvert-copy-{table_name}", daemon=True)
+        thread.start()
+        try:
+            lines = []
+            for line in source:
+                lines.append(line[:-1].split("\t"))
+                if len(lines) >= self.chunk_size:
+                    yield decode(lines)
+                    lines = []
+            if lines:
+                yield decode(lines)
+        finally:
+            if thread.is_alive():
+                # The consumer stopped early: abort the COPY and unblock the helper thread
+                dbapi_conn.cancel()
+            source.close()
+            thread.join()
+            copy_cursor.close()
+            cursor.close()
+        if errors:
+            raise errors[0]
+
+    def estimate_row_count(self, conn, table_name: str) -> int:
+        """Use the planner's row estimate instead of a full COUNT(*)."""
+        estimate = conn.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": self.table_ref(table_name)}
+        ).scalar()
+        if estimate is None or estimate < 0:
+            # Never vacuumed or analyzed
+            return super().estimate_row_count(conn, table_name)
+        return estimate
+
+    def estimate_row_counts(self, conn, table_names: List[str]) -> Dict[str, int]:
+        """Read the planner's row estimates of all tables in one query."""
+        rows = conn.execute(
+            text(
+                "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = COALESCE(CAST(:schema AS text), current_schema()) AND c.relname = ANY(:names)"
+            ),
+            {"names": list(table_names), "schema": self.schema}
+        ).all()
+        estimates = {name: estimate for name, estimate in rows if estimate is not None and estimate >= 0}
+        # Tables that were never vacuumed or analyzed have no estimate yet
+        for table_name in table_names:
+            if table_name not in estimates:
+                estimates[table_name] = self.estimate_row_count(conn, table_name)
+        return estimates
+
+    def sample_filter(self, table_name: str, meta: Dict[str, Any], percent: float) -> Tuple[str, List[str]]:
+        """Sample whole pages with TABLESAMPLE SYSTEM, so skipped pages are never read.
+
+        A fixed REPEATABLE seed makes every partition of a table, and a resumed
+        run, pick the same pages.
+        """
+        return f"TABLESAMPLE SYSTEM ({percent}) REPEATABLE (0)", []
+
+    def get_partition_boundaries(self, conn, table_name: str, column: str, partitions: int, row_estimate: int) -> List[Any]:
+        """Take quantiles of non-integer keys from a TABLESAMPLE instead of probing the index."""
+        if partitions <= 1 or row_estimate <= 0:
+            return []
+        low = conn.execute(text(f"SELECT MIN({self.quote(column)}) FROM {self.table_ref(table_name)}")).scalar()
+        if low is None or isinstance(low, int):
+            return super().get_partition_boundaries(conn, table_name, column, partitions, row_estimate)
+
+        sample_percent = min(100.0, 100.0 * 100000 / row_estimate)
+        quantiles = conn.execute(
+            text(
+                f"SELECT percentile_disc(CAST(:fractions AS double precision[])) "
+                f"WITHIN GROUP (ORDER BY {self.quote(column)}) "
+                f"FROM {self.table_ref(table_name)} TABLESAMPLE SYSTEM (:percent)"
+            ),
+            {"fractions": [i / partitions for i in range(1, partitions)], "percent": sample_percent}
+        ).scalar()
+        boundaries = []
+        for value in quantiles or []:
+            if value is not None and (not boundaries or value > boundaries[-1]):
+                boundaries.append(value)
+        return boundaries
+
     def map_column_type(self, col_type: str) -> str:
         """Override type mapping for PostgreSQL-specific types."""
         type_str = str(col_type).lower()
@@ -18,4 +276,10 @@ class PostgresConverter(BaseConverter):
             return "BLOB"  # Store binary data as BLOB in SQLite
             
         # Use base class mapping for other types
-        return super().map_column_type(col_type) 
\ No newline at end of file
+        return super().map_column_type(col_type)
+
+    def get_value_converter(self, col: Dict[str, Any], sqlite_type: str) -> Optional[ValueConverter]:
+        """Handle values that psycopg2 returns as Python containers."""
+        if isinstance(col["type"], postgresql.HSTORE):
+            return to_json
+        return super().get_value_converter(col, sqlite_type) 
\ No newline at end of file
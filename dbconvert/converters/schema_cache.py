@@ -0,0 +1,56 @@
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Optional
+from dbconvert.core.loggingsetup import LoggerManager
+
+logger = LoggerManager.get_logger()
+
+# Bumped whenever the layout of the cached metadata changes
+CACHE_FORMAT = 1
+
+
+class SchemaCache:
+    """Reflected table metadata pickled to a file, valid for one schema fingerprint.
+
+    The cache key combines the source URL (without password) and schema, the schema
+    fingerprint computed by the converter and the SQLAlchemy version, so a
+    cache written for another database, an altered schema or another release
+    of SQLAlchemy is never used.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def make_key(url: str, fingerprint: str, schema: Optional[str] = None) -> str:
+        import sqlalchemy
+
+        return hashlib.sha256(
+            f"{CACHE_FORMAT}|{sqlalchemy.__version__}|{url}|{schema or ''}|{fingerprint}".encode()
+        ).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return the cached tables for `key`, or None if the cache is missing or stale."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable schema cache {self.path}: {str(e)}")
+            return None
+        if not isinstance(cached, dict) or cached.get("key") != key:
+            logger.info("Schema changed since the schema cache was written, reflecting again")
+            return None
+        return cached["tables"]
+
+    def save(self, key: str, tables: Dict[str, Dict[str, Any]]):
+        """Write the tables for `key`, replacing the cache file atomically."""
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        partial_path = f"{self.path}.partial"
+        with open(partial_path, "wb") as f:
+            pickle.dump({"key": key, "tables": tables}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial_path, self.path)
@@ -0,0 +1,14 @@
+# Default tuning values shared by the converters, the CLI and the GUI.
+# Kept free of heavy imports so the CLI can build its options without loading any driver.
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_PARTITION_ROWS = 1000000
+
+# Batch conversions running at once against the same source host
+DEFAULT_BATCH_PER_HOST = 2
+
+# Size of the pieces in which large binary values are read and written, see --large-object-mb
+DEFAULT_LARGE_OBJECT_PIECE_BYTES = 4 * 1024 * 1024
+
+# Rows per key range hashed by the verify command
+DEFAULT_VERIFY_CHUNK_ROWS = 100000
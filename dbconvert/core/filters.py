@@ -0,0 +1,134 @@
+import fnmatch
+import sys
+from typing import Any, Dict, List, Optional
+from dbconvert.core.loggingsetup import LoggerManager
+
+logger = LoggerManager.get_logger()
+
+
+class SourceFilters:
+    """Which tables, columns and rows of the source database to convert.
+
+    - `include` / `exclude`: table name globs; with no `include`, every table
+      not excluded is converted.
+    - `columns`: per-table list of the columns to read (a projection).
+    - `where`: per-table SQL predicate, in the source database's dialect.
+    - `sample`: per-table percentage of rows to read.
+
+    The converter turns the column, row and sample filters into the SELECT
+    sent to the source, so filtered-out data never leaves the database.
+    """
+
+    def __init__(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        columns: Optional[Dict[str, List[str]]] = None,
+        where: Optional[Dict[str, str]] = None,
+        sample: Optional[Dict[str, float]] = None,
+    ):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.columns = dict(columns or {})
+        self.where = dict(where or {})
+        self.sample = {}
+        for table_name, percent in (sample or {}).items():
+            percent = float(percent)
+            if not 0 < percent <= 100:
+                raise ValueError(f"Sample percentage of {table_name} must be greater than 0 and at most 100, got {percent}")
+            self.sample[table_name] = percent
+
+    @classmethod
+    def from_config(cls, path: str) -> "SourceFilters":
+        """Load filters from a TOML file.
+
+        Example::
+
+            include = ["orders*", "customers"]
+            exclude = ["*_archive"]
+
+            [tables.orders]
+            columns = ["id", "customer_id", "total", "created_at"]
+            where = "created_at >= now() - interval '90 days'"
+            sample = 10
+        """
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            import tomli as tomllib
+
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+
+        columns, where, sample = {}, {}, {}
+        for table_name, options in config.get("tables", {}).items():
+            unknown = set(options) - {"columns", "where", "sample"}
+            if unknown:
+                raise ValueError(f"Unknown options for table {table_name} in {path}: {', '.join(sorted(unknown))}")
+            if "columns" in options:
+                columns[table_name] = list(options["columns"])
+            if "where" in options:
+                where[table_name] = options["where"]
+            if "sample" in options:
+                sample[table_name] = options["sample"]
+        return cls(config.get("include"), config.get("exclude"), columns, where, sample)
+
+    def merge(self, other: "SourceFilters") -> "SourceFilters":
+        """Combine two sets of filters; globs add up and per-table settings of `other` win."""
+        return SourceFilters(
+            self.include + other.include,
+            self.exclude + other.exclude,
+            {**self.columns, **other.columns},
+            {**self.where, **other.where},
+            {**self.sample, **other.sample},
+        )
+
+    def is_empty(self) -> bool:
+        return not (self.include or self.exclude or self.columns or self.where or self.sample)
+
+    def matches(self, table_name: str) -> bool:
+        if self.include and not any(fnmatch.fnmatchcase(table_name, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatchcase(table_name, pattern) for pattern in self.exclude)
+
+    def select_tables(self, table_names: List[str]) -> List[str]:
+        """Return the tables to convert, in source order."""
+        selected = [table_name for table_name in table_names if self.matches(table_name)]
+        for pattern in self.include:
+            if not any(fnmatch.fnmatchcase(table_name, pattern) for table_name in table_names):
+                logger.warning(f"--include pattern '{pattern}' does not match any table")
+        configured = set(self.columns) | set(self.where) | set(self.sample)
+        for table_name in sorted(configured - set(selected)):
+            logger.warning(f"Filters configured for table {table_name}, which is not converted")
+        return selected
+
+    def project(self, table_name: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Restrict reflected metadata to the table's projected columns.
+
+        Keys, indexes and constraints that use a column left out are dropped
+        with it.
+        """
+        names = self.columns.get(table_name)
+        if not names:
+            return meta
+        by_name = {col["name"]: col for col in meta["columns"]}
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            raise ValueError(f"Columns {', '.join(missing)} do not exist in table {table_name}")
+        kept = set(names)
+
+        def covered(columns: List[str]) -> bool:
+            return set(columns) <= kept
+
+        projected = dict(meta)
+        projected["columns"] = [by_name[name] for name in names]
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        if not covered(pk_columns):
+            logger.warning(f"Projection of {table_name} leaves out primary key columns; the table is converted without a primary key")
+            projected["primary_keys"] = {"constrained_columns": [], "name": None}
+        projected["foreign_keys"] = [fk for fk in meta.get("foreign_keys", []) if covered(fk["constrained_columns"])]
+        projected["indexes"] = [index for index in meta.get("indexes", []) if covered(index["column_names"])]
+        projected["unique_constraints"] = [
+            constraint for constraint in meta.get("unique_constraints", []) if covered(constraint["column_names"])
+        ]
+        return projected
@@ -0,0 +1,31 @@
+from typing import Any
+
+
+class LargeObject:
+    """Placeholder for a binary value too large to be read with the rest of its row.
+
+    The converter puts it in place of the value and the writer stores a
+    zero-filled BLOB of `length` bytes, which is then filled in with the
+    pieces read separately from the source row with primary key `key`.
+    """
+
+    __slots__ = ("column", "key", "length")
+
+    def __init__(self, column: str, key: Any, length: int):
+        self.column = column
+        self.key = key
+        self.length = length
+
+    def __repr__(self):
+        return f"LargeObject({self.column!r}, {self.key!r}, {self.length})"
+
+
+class LargeObjectPiece:
+    """`data` to be written at byte `offset` of a large object."""
+
+    __slots__ = ("large_object", "offset", "data")
+
+    def __init__(self, large_object: LargeObject, offset: int, data):
+        self.large_object = large_object
+        self.offset = offset
+        self.data = data
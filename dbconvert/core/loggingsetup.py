@@ -1,4 +1,15 @@
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Level of the app logger unless changed with LoggerManager.set_level
+DEFAULT_LEVEL = logging.INFO
+
+# DEBUG records from one line of code are let through at most once per this many seconds
+DEBUG_RATE_LIMIT_SECONDS = 1.0
 
 class ColorFormatter(logging.Formatter):
     COLORS = {
@@ -15,28 +26,105 @@ class ColorFormatter(logging.Formatter):
         msg = super().format(record)
         return f"{color}{msg}{self.RESET}"
 
+class RateLimitFilter(logging.Filter):
+    """Let through at most one DEBUG record per call site every `interval` seconds.
+
+    Per-batch debug messages of busy reader and writer threads would otherwise
+    flood the log. The next record let through from a call site mentions how
+    many were dropped since the last one. Records above DEBUG always pass.
+    """
+
+    def __init__(self, interval: float = DEBUG_RATE_LIMIT_SECONDS):
+        super().__init__()
+        self.interval = interval
+        self._last_seen = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            last_seen = self._last_seen.get(key)
+            if last_seen is not None and now - last_seen < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last_seen[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
 class TkinterHandler(logging.Handler):
+    """Show log records in a Tk text widget.
+
+    Records may come from any thread, and Tk widgets may only be touched from
+    the main loop, so `emit` only queues the formatted record. `poll` runs on
+    the main loop every `POLL_INTERVAL_MS` and inserts at most
+    `MAX_RECORDS_PER_POLL` queued records per tick, so a burst of log records
+    never stalls the window. The widget keeps the last `MAX_LINES` lines.
+    """
+
+    POLL_INTERVAL_MS = 100
+    MAX_RECORDS_PER_POLL = 500
+    MAX_LINES = 10000
+
     def __init__(self, widget):
         super().__init__()
         self.widget = widget
+        self.records = queue.SimpleQueue()
         self.widget.tag_config("DEBUG", foreground="cyan")
         self.widget.tag_config("INFO", foreground="green")
         self.widget.tag_config("WARNING", foreground="orange")
         self.widget.tag_config("ERROR", foreground="red")
         self.widget.tag_config("CRITICAL", foreground="magenta")
+        self._poll_id = self.widget.after(self.POLL_INTERVAL_MS, self.poll)
 
     def emit(self, record):
-        msg = self.format(record) + "\n"
-        level = record.levelname
-        def append():
+        try:
+            self.records.put((self.format(record) + "\n", record.levelname))
+        except Exception:
+            self.handleError(record)
+
+    def poll(self):
+        """Insert queued records into the widget and schedule the next tick."""
+        inserted = 0
+        while inserted < self.MAX_RECORDS_PER_POLL:
+            try:
+                msg, level = self.records.get_nowait()
+            except queue.Empty:
+                break
             self.widget.insert("end", msg, level)
+            inserted += 1
+        if inserted:
+            lines = int(self.widget.index("end-1c").split(".")[0])
+            if lines > self.MAX_LINES:
+                self.widget.delete("1.0", f"{lines - self.MAX_LINES}.0")
             self.widget.see("end")
-        self.widget.after(0, append)
+        self._poll_id = self.widget.after(self.POLL_INTERVAL_MS, self.poll)
+
+    def close(self):
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        super().close()
 
 class LoggerManager:
+    """Owner of the app logger.
+
+    Logging calls only put records on a queue; a `QueueListener` thread
+    formats them and writes them to the console (and the GUI, if any), so
+    logging never blocks the threads that read and write data. The listener
+    is stopped, and the queue drained, when the process exits.
+    """
+
     _instance = None
     _logger = None
     _gui_handler: TkinterHandler = None
+    _listener: QueueListener = None
+    _queue_handler: QueueHandler = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -47,25 +135,66 @@ class LoggerManager:
     def get_logger(cls, name: str = "app_logger") -> logging.Logger:
         if cls._logger is None:
             cls._logger = logging.getLogger(name)
-            cls._logger.setLevel(logging.DEBUG)
+            cls._logger.setLevel(DEFAULT_LEVEL)
             
-            # Add console handler
+            # Add console handler, run by the listener thread
             ch = logging.StreamHandler()
             ch.setFormatter(ColorFormatter("[%(levelname)s] %(message)s"))
-            cls._logger.addHandler(ch)
+
+            records = queue.SimpleQueue()
+            cls._queue_handler = QueueHandler(records)
+            cls._queue_handler.addFilter(RateLimitFilter())
+            cls._logger.addHandler(cls._queue_handler)
+            cls._listener = QueueListener(records, ch, respect_handler_level=True)
+            cls._listener.start()
+            atexit.register(cls.shutdown)
         
         return cls._logger
+
+    @classmethod
+    def set_level(cls, level: int) -> None:
+        """Set the level of the app logger, e.g. logging.WARNING for quiet mode."""
+        cls.get_logger().setLevel(level)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Write out all queued records and stop the listener thread.
+
+        Records logged afterwards are handled synchronously by the same handlers.
+        """
+        if cls._listener is None:
+            return
+        listener, cls._listener = cls._listener, None
+        listener.stop()
+        cls._logger.removeHandler(cls._queue_handler)
+        for handler in listener.handlers:
+            cls._logger.addHandler(handler)
+
+    @classmethod
+    def _add_handler(cls, handler: logging.Handler) -> None:
+        if cls._listener is not None:
+            cls._listener.handlers = cls._listener.handlers + (handler,)
+        else:
+            cls._logger.addHandler(handler)
+
+    @classmethod
+    def _remove_handler(cls, handler: logging.Handler) -> None:
+        if cls._listener is not None:
+            cls._listener.handlers = tuple(h for h in cls._listener.handlers if h is not handler)
+        cls._logger.removeHandler(handler)
     
     @classmethod
     def set_gui_logger(cls, widget) -> None:
         """Set up GUI logging with the provided widget."""
+        cls.get_logger()
         # Remove existing GUI handler if any
         if cls._gui_handler:
-            cls.get_logger().removeHandler(cls._gui_handler)
+            cls._remove_handler(cls._gui_handler)
+            cls._gui_handler.close()
         
         handler = TkinterHandler(widget)
         handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
-        cls.get_logger().addHandler(handler)
+        cls._add_handler(handler)
         cls._gui_handler = handler
         
         return cls._logger
@@ -74,5 +203,6 @@ class LoggerManager:
     def remove_gui_logger(cls) -> None:
         """Remove the GUI logger handler."""
         if cls._gui_handler:
-            cls.get_logger().removeHandler(cls._gui_handler)
+            cls._remove_handler(cls._gui_handler)
+            cls._gui_handler.close()
             cls._gui_handler = None
\ No newline at end of file
@@ -1,44 +1,61 @@
-import sys
-from pathlib import Path
+from email.utils import getaddresses
+from importlib import metadata as importlib_metadata
 from typing import Dict, Any, Optional
 
-try:
-    if sys.version_info >= (3, 11):
-        import tomllib
-    else:
-        import tomli as tomllib
-except ImportError:
-    raise ImportError("tomli is required for Python < 3.11")
+DISTRIBUTION_NAME = "dbconvert"
+
+# Labels of the author links in the `[project.urls]` table of pyproject.toml
+AUTHOR_URL_LABEL = "Author"
+AUTHOR_LINKEDIN_URL_LABEL = "Author LinkedIn"
 
 _metadata_cache: Optional[Dict[str, Any]] = None
-PYPROJECT_PATH = Path("pyproject.toml")
 
 
-def _parse_pyproject(path: Path) -> Dict[str, Any]:
-    try:
-        with path.open("rb") as f:
-            return tomllib.load(f)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"{path} not found.")
-    except tomllib.TOMLDecodeError as e:
-        raise ValueError(f"Error parsing TOML: {e}")
-    except Exception as e:
-        raise Exception(f"Unexpected error reading {path}: {e}")
-
-
-def load_pyproject_metadata() -> Dict[str, Any]:
-    """Load and cache minimal metadata from pyproject.toml"""
+def _author_links(author_name: str, urls: Dict[str, str]) -> Dict[str, str]:
+    author_github = urls.get(AUTHOR_URL_LABEL, "")
+    return {
+        "author_name": author_name,
+        # The last path segment of the author's profile, e.g. the GitHub username
+        "author_username": author_github.rstrip("/").rsplit("/", 1)[-1] if author_github else author_name,
+        "author_github": author_github,
+        "author_linkedin": urls.get(AUTHOR_LINKEDIN_URL_LABEL, ""),
+    }
+
+
+def load_package_metadata() -> Dict[str, Any]:
+    """Load and cache the name, version, author and links of the installed package.
+
+    Everything is read from the installed distribution with `importlib.metadata`,
+    which carries the `[project]` table of pyproject.toml, so it works from any
+    working directory. A source checkout that is not installed (see
+    `pip install -e .`) reports an unknown version and no links.
+    """
     global _metadata_cache
     if _metadata_cache is not None:
         return _metadata_cache
 
-    data = _parse_pyproject(PYPROJECT_PATH)
+    try:
+        dist = importlib_metadata.metadata(DISTRIBUTION_NAME)
+    except importlib_metadata.PackageNotFoundError:
+        _metadata_cache = {
+            "name": DISTRIBUTION_NAME,
+            "version": "unknown",
+            "repository": "",
+            "internalurls": {},
+        }
+        return _metadata_cache
 
+    urls = {}
+    for entry in dist.get_all("Project-URL") or []:
+        label, _, url = entry.partition(",")
+        urls[label.strip()] = url.strip()
+    # An author with an email address is only listed in Author-email, as "Name <address>"
+    authors = getaddresses([dist["Author-email"] or ""])
+    author_name = dist["Author"] or (authors[0][0] if authors else "")
     _metadata_cache = {
-        "internalurls": data.get("tool", {}).get("internalurls", {}),
-        "repository": data.get("project", {}).get("urls", {}).get("Repository", ""),
-        "name": data.get("project", {}).get("name", ""),
-        "version": data.get("project", {}).get("version", ""),
+        "name": dist["Name"],
+        "version": dist["Version"],
+        "repository": urls.get("Repository", ""),
+        "internalurls": _author_links(author_name, urls),
     }
-
     return _metadata_cache
@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from dbconvert.core.loggingsetup import LoggerManager
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+logger = LoggerManager.get_logger()
+
+# Number of tables listed in the slowest-tables summary
+SUMMARY_TABLES = 5
+
+# Column types whose values are counted by length rather than as 8 bytes
+_VARIABLE_WIDTH_TYPES = ("TEXT", "BLOB")
+
+
+def estimate_batch_bytes(meta: Dict[str, Any], rows) -> int:
+    """Approximate the payload size of a converted batch.
+
+    Fixed-width values count as 8 bytes; only TEXT and BLOB columns are
+    measured, which keeps the estimate cheap for wide numeric tables.
+    """
+    if not rows:
+        return 0
+    columns = meta["columns"]
+    variable = [index for index, col in enumerate(columns) if col.get("sqlite_type") in _VARIABLE_WIDTH_TYPES]
+    size = 8 * (len(columns) - len(variable)) * len(rows)
+    for index in variable:
+        size += sum(len(row[index]) for row in rows if isinstance(row[index], (str, bytes)))
+    return size
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class ConversionMetrics:
+    """Per-table timings and volumes of one conversion run.
+
+    Readers record read and convert times, the writer records write times.
+    All methods are thread-safe. Only the work done in this run is counted,
+    so rows restored from a checkpoint on resume are not included.
+    """
+
+    # Prometheus metric name, help text and `table_report` field of each per-table gauge
+    TABLE_GAUGES = [
+        ("dbconvert_table_rows", "Rows converted", "rows"),
+        ("dbconvert_table_bytes", "Approximate bytes transferred", "bytes"),
+        ("dbconvert_table_read_seconds", "Time spent reading from the source", "read_seconds"),
+        ("dbconvert_table_convert_seconds", "Time spent converting values", "convert_seconds"),
+        ("dbconvert_table_write_seconds", "Time spent writing to SQLite", "write_seconds"),
+        ("dbconvert_table_elapsed_seconds", "Wall-clock time from the first read to the last write", "elapsed_seconds"),
+        ("dbconvert_table_rows_per_second", "Rows converted per second of elapsed time", "rows_per_second"),
+        ("dbconvert_table_peak_batch_bytes", "Approximate size of the largest batch", "peak_batch_bytes"),
+    ]
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _table(self, table_name: str) -> Dict[str, Any]:
+        table = self.tables.get(table_name)
+        if table is None:
+            table = self.tables[table_name] = {
+                "rows": 0,
+                "bytes": 0,
+                "read_seconds": 0.0,
+                "convert_seconds": 0.0,
+                "write_seconds": 0.0,
+                "peak_batch_bytes": 0,
+                "first_read_at": None,
+                "last_write_at": None,
+            }
+        return table
+
+    def start(self):
+        self.started_at = time.time()
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def record_read(self, table_name: str, started: float, seconds: float):
+        with self._lock:
+            table = self._table(table_name)
+            table["read_seconds"] += seconds
+            if table["first_read_at"] is None or started < table["first_read_at"]:
+                table["first_read_at"] = started
+
+    def record_convert(self, table_name: str, seconds: float, batch_bytes: int):
+        with self._lock:
+            table = self._table(table_name)
+            table["convert_seconds"] += seconds
+            table["bytes"] += batch_bytes
+            table["peak_batch_bytes"] = max(table["peak_batch_bytes"], batch_bytes)
+
+    def record_write(self, table_name: str, rows: int, seconds: float):
+        with self._lock:
+            table = self._table(table_name)
+            table["rows"] += rows
+            table["write_seconds"] += seconds
+            table["last_write_at"] = time.time()
+
+    def table_report(self, table_name: str) -> Dict[str, Any]:
+        table = self.tables[table_name]
+        elapsed = 0.0
+        if table["first_read_at"] is not None and table["last_write_at"] is not None:
+            elapsed = max(0.0, table["last_write_at"] - table["first_read_at"])
+        return {
+            "rows": table["rows"],
+            "bytes": table["bytes"],
+            "read_seconds": round(table["read_seconds"], 3),
+            "convert_seconds": round(table["convert_seconds"], 3),
+            "write_seconds": round(table["write_seconds"], 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(table["rows"] / elapsed, 1) if elapsed else 0.0,
+            "peak_batch_bytes": table["peak_batch_bytes"],
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Return the whole run as a JSON-serializable dict."""
+        with self._lock:
+            tables = {table_name: self.table_report(table_name) for table_name in self.tables}
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": duration,
+            "rows": sum(table["rows"] for table in tables.values()),
+            "bytes": sum(table["bytes"] for table in tables.values()),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "tables": tables,
+        }
+
+    def slowest_tables(self, count: int = SUMMARY_TABLES) -> List[tuple]:
+        tables = self.report()["tables"]
+        return sorted(tables.items(), key=lambda item: item[1]["elapsed_seconds"], reverse=True)[:count]
+
+    def log_summary(self, count: int = SUMMARY_TABLES):
+        """Log the tables that took longest, with the split between read, convert and write."""
+        slowest = self.slowest_tables(count)
+        if not slowest:
+            return
+        logger.info(f"Slowest tables (of {len(self.tables)}):")
+        for table_name, table in slowest:
+            logger.info(
+                f"  {table_name}: {table['rows']} rows in {table['elapsed_seconds']:.2f}s "
+                f"({table['rows_per_second']:,.0f} rows/s, {table['bytes'] / (1024 * 1024):.1f} MB) "
+                f"read {table['read_seconds']:.2f}s, convert {table['convert_seconds']:.2f}s, write {table['write_seconds']:.2f}s"
+            )
+
+    def to_prometheus(self) -> str:
+        """Render the report in the Prometheus text exposition format (for the node_exporter textfile collector)."""
+        report = self.report()
+        lines = []
+        for name, help_text, field in self.TABLE_GAUGES:
+            lines.append(f"# HELP {name} {help_text} per table in the last conversion.")
+            lines.append(f"# TYPE {name} gauge")
+            for table_name, table in report["tables"].items():
+                lines.append(f'{name}{{table="{_prometheus_label(table_name)}"}} {table[field]}')
+        for name, help_text, value in [
+            ("dbconvert_run_duration_seconds", "Duration of the last conversion.", report["duration_seconds"] or 0),
+            ("dbconvert_run_rows", "Rows converted in the last conversion.", report["rows"]),
+            ("dbconvert_run_peak_rss_bytes", "Peak resident memory of the last conversion.", report["peak_rss_bytes"] or 0),
+            ("dbconvert_run_timestamp_seconds", "Start time of the last conversion.", report["started_at"] or 0),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the report to `path`: Prometheus text for `.prom` files, JSON otherwise."""
+        if path.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.report(), indent=2) + "\n"
+        # Written next to the target and renamed, so collectors never read a partial file
+        partial_path = f"{path}.partial"
+        with open(partial_path, "w") as f:
+            f.write(content)
+        os.replace(partial_path, path)
+        logger.info(f"Metrics written to {path}")
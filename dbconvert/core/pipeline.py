@@ -0,0 +1,333 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import ExitStack
+from typing import Dict, Any, List, Optional
+from rich.progress import Progress
+from dbconvert.converters.base_converter import DEFAULT_PARTITION_ROWS
+from dbconvert.core.large_objects import LargeObject, LargeObjectPiece
+from dbconvert.core.loggingsetup import LoggerManager
+from dbconvert.core.metrics import ConversionMetrics, estimate_batch_bytes
+
+logger = LoggerManager.get_logger()
+
+DEFAULT_QUEUE_SIZE = 8
+
+# Marks the end of a table in the batch queue, and the end of the run when sent without a table
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised inside pipeline threads once the run has been cancelled."""
+
+
+class ConversionPipeline:
+    """Convert a database with source reads and SQLite writes running concurrently.
+
+    Reader threads stream row batches from the converter into a bounded queue
+    and a single writer thread drains it into the `SQLiteWriter`. The queue
+    size caps how many batches can be in flight, so a slow side applies
+    backpressure to the fast side. The first error on either side cancels the
+    whole run and is re-raised from `run`.
+
+    Each reader owns one pooled source connection. All of them are opened
+    before reading starts and put on a shared snapshot with
+    `converter.begin_snapshot`, so concurrent readers see consistent data.
+    Tables with more than `partition_rows` rows are split into primary key
+    ranges (see `converter.plan_partitions`) that are read concurrently and
+    merged into the same SQLite table.
+
+    When the converter has a large-object threshold, binary values above it
+    travel through the queue as pieces (`LargeObjectPiece`) that the writer
+    streams into zero-filled BLOBs, so no value is ever held whole in memory.
+
+    Read, convert and write times, volumes and batch sizes of every table are
+    recorded in `metrics` (a `ConversionMetrics`), and a summary of the
+    slowest tables is logged at the end of the run. `rows_written` and
+    `rows_expected` (the source's row estimate, None until known) can be read
+    from another thread to follow progress, and `cancel` can be called from
+    another thread to stop the run.
+    """
+
+    def __init__(
+        self,
+        converter,
+        writer,
+        readers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        partition_rows: int = DEFAULT_PARTITION_ROWS,
+        show_progress: Optional[bool] = None,
+    ):
+        if readers is None:
+            readers = converter.workers
+        if readers <= 0:
+            raise ValueError("Number of readers must be a positive integer")
+        if converter.large_object_threshold and not writer.supports_large_objects():
+            logger.warning("Large binary values are read whole: writing them in pieces needs Python 3.11 or later")
+            converter.large_object_threshold = None
+        self.converter = converter
+        self.writer = writer
+        self.readers = readers
+        self.partition_rows = partition_rows
+        # Progress bars are hidden along with INFO messages in quiet mode, unless set explicitly
+        self.show_progress = logger.isEnabledFor(logging.INFO) if show_progress is None else show_progress
+        # Number of key ranges of each table that was split, filled in by `run`
+        self.partitions: Dict[str, int] = {}
+        self.metrics = ConversionMetrics()
+        self.rows_expected: Optional[int] = None
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._cancelled = threading.Event()
+        self._errors: List[BaseException] = []
+        self._errors_lock = threading.Lock()
+
+    def cancel(self):
+        """Ask all pipeline threads to stop as soon as possible."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self, table_names: Optional[List[str]] = None) -> Dict[str, int]:
+        """Convert the given tables (all tables selected by the converter's filters by default) and return the row count written per table."""
+        if table_names is None:
+            table_names = self.converter.get_table_names()
+
+        # Reflect everything up front so the writer can create tables before any data arrives,
+        # referenced tables first
+        tables = self.writer.order_tables(self.converter.reflect_tables(table_names))
+        if self.cancelled:
+            self.writer.close()
+            raise PipelineCancelled("Conversion was cancelled")
+
+        self.metrics.start()
+        with ExitStack() as stack, Progress(disable=not self.show_progress) as progress:
+            progress_task = progress.add_task("[cyan]Writing tables...", total=len(tables))
+
+            conns = [stack.enter_context(self.converter.engine.connect()) for _ in range(self.readers)]
+            self.converter.begin_snapshot(conns)
+            tasks, pending = self._prepare(conns[0], tables, progress, progress_task)
+
+            # Rows are counted against the source's own (possibly approximate) row estimates
+            estimates = self.converter.estimate_row_counts(conns[0], [name for name, count in pending.items() if count])
+            self.rows_expected = sum(estimates.values()) or None
+            rows_task = progress.add_task("[cyan]Converting rows...", total=self.rows_expected)
+
+            writer_thread = threading.Thread(
+                target=self._guard, args=(self._write, tables, pending, progress, progress_task, rows_task),
+                name="dbconvert-writer", daemon=True
+            )
+            reader_threads = [
+                threading.Thread(target=self._guard, args=(self._read, conn, tables, tasks), name=f"dbconvert-reader-{i}", daemon=True)
+                for i, conn in enumerate(conns)
+            ]
+
+            writer_thread.start()
+            for thread in reader_threads:
+                thread.start()
+
+            try:
+                for thread in reader_threads:
+                    thread.join()
+                if not self.cancelled:
+                    self._guard(self._put, (None, None, _END, None))
+                writer_thread.join()
+            except BaseException:
+                # e.g. KeyboardInterrupt in the main thread: stop the workers before leaving
+                self.cancel()
+                for thread in reader_threads + [writer_thread]:
+                    thread.join()
+                raise
+            finally:
+                self.metrics.finish()
+
+        if self._errors or self.cancelled:
+            self.writer.close()
+            if os.path.exists(self.writer.write_path):
+                logger.info(f"Partial database kept at {self.writer.write_path}; run again with --resume to continue")
+        if self._errors:
+            raise self._errors[0]
+        if self.cancelled:
+            raise PipelineCancelled("Conversion was cancelled")
+
+        if self.partitions:
+            summary = ", ".join(f"{name} ({count})" for name, count in self.partitions.items())
+            logger.info(f"Partitioned tables: {summary}")
+        self.metrics.log_summary()
+        return {table_name: self.writer.row_counts.get(table_name, 0) for table_name in tables}
+
+    def _prepare(self, conn, tables: Dict[str, Dict[str, Any]], progress: Progress, progress_task):
+        """Create the target tables and queue the partitions that still have to be read.
+
+        On a fresh run every table is planned (and large ones split) from
+        scratch. When the writer resumes an interrupted run, the recorded
+        partitions are reused: completed ones are skipped and the rest continue
+        after their last checkpoint.
+        """
+        checkpoints = self.writer.checkpoints.load() if self.writer.resume else {}
+        tasks = queue.Queue()
+        pending: Dict[str, int] = {}
+
+        for table_name, meta in tables.items():
+            self.writer.create_table(table_name, meta)
+            key_column = self.converter.get_partition_column(meta)
+
+            if table_name in checkpoints:
+                partitions = checkpoints[table_name]
+                self.writer.row_counts[table_name] = self.writer.checkpoints.rows_written(table_name)
+                resume_by_key = self.writer.key_order_matches(meta, key_column)
+                if not resume_by_key and not all(partition["completed"] for partition in partitions):
+                    # The rows already written cannot be matched to key ranges inside SQLite
+                    logger.info(f"Reading table {table_name} again from the start")
+                    partitions = self.writer.restart_table(table_name)
+            else:
+                planned = self.converter.plan_partitions(conn, table_name, meta, self.partition_rows, self.readers)
+                partitions = self.writer.checkpoints.register(table_name, planned)
+                self.writer.row_counts[table_name] = 0
+
+            if len(partitions) > 1:
+                self.partitions[table_name] = len(partitions)
+                logger.info(f"Split table {table_name} into {len(partitions)} partitions")
+
+            remaining = [partition for partition in partitions if not partition["completed"]]
+            pending[table_name] = len(remaining)
+            if not remaining:
+                logger.info(f"Skipping table already converted: {table_name}")
+                progress.advance(progress_task)
+                continue
+
+            for partition in remaining:
+                if table_name in checkpoints and resume_by_key:
+                    self.writer.discard_uncommitted(table_name, key_column, partition)
+                tasks.put((table_name, key_column, partition))
+
+        self.writer.commit()
+        return tasks, pending
+
+    def _guard(self, target, *args):
+        """Run a pipeline step, recording its error and cancelling the run if it fails."""
+        try:
+            target(*args)
+        except PipelineCancelled:
+            pass
+        except BaseException as e:
+            with self._errors_lock:
+                self._errors.append(e)
+            self.cancel()
+
+    def _put(self, item):
+        while True:
+            if self.cancelled:
+                raise PipelineCancelled()
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self):
+        while True:
+            if self.cancelled:
+                raise PipelineCancelled()
+            try:
+                return self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _read(self, conn, tables: Dict[str, Dict[str, Any]], tasks: queue.Queue):
+        while not self.cancelled:
+            try:
+                table_name, key_column, partition = tasks.get_nowait()
+            except queue.Empty:
+                return
+            logger.info(f"Reading table: {table_name}")
+
+            # Rows are read in key order so the last key of each batch is a valid resume point
+            where, params = self.converter.partition_where(
+                key_column, (partition["low_key"], partition["high_key"]), partition["last_key"]
+            )
+            order_by = [key_column] if key_column else None
+            key_index = [col["name"] for col in tables[table_name]["columns"]].index(key_column) if key_column else None
+
+            chunks = self.converter.iter_table_chunks(conn, table_name, where, params, order_by)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            large_object_indexes = [index for index, _ in tables[table_name].get("large_objects", [])]
+            large_objects: List[LargeObject] = []
+            while True:
+                started = time.time()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                read_seconds = time.time() - started
+                last_key = chunk[-1][key_index] if key_column else None
+
+                convert_started = time.time()
+                chunk = self.converter.convert_batch(tables[table_name], chunk)
+                convert_seconds = time.time() - convert_started
+                self.metrics.record_read(table_name, started, read_seconds)
+                self.metrics.record_convert(table_name, convert_seconds, estimate_batch_bytes(tables[table_name], chunk))
+                if debug:
+                    logger.debug(
+                        f"Read {len(chunk)} rows of {table_name} (partition {partition['partition_no']}) "
+                        f"in {read_seconds:.3f}s, converted in {convert_seconds:.3f}s"
+                    )
+                if large_object_indexes:
+                    large_objects.extend(
+                        row[index] for row in chunk for index in large_object_indexes if isinstance(row[index], LargeObject)
+                    )
+                self._put((table_name, partition["partition_no"], chunk, last_key))
+
+            # Pieces are read once the partition's result is consumed, as the connection may not run
+            # other queries while a result is streamed; they reach the writer after their rows
+            for large_object in large_objects:
+                offset = 0
+                pieces = self.converter.iter_large_object(conn, table_name, tables[table_name], large_object)
+                while True:
+                    started = time.time()
+                    data = next(pieces, None)
+                    if data is None:
+                        break
+                    self.metrics.record_read(table_name, started, time.time() - started)
+                    # Piece sizes count towards the table's volume
+                    self.metrics.record_convert(table_name, 0.0, len(data))
+                    self._put((table_name, partition["partition_no"], LargeObjectPiece(large_object, offset, data), None))
+                    offset += len(data)
+            self._put((table_name, partition["partition_no"], _END, None))
+
+    def _write(self, tables: Dict[str, Dict[str, Any]], pending: Dict[str, int], progress: Progress, progress_task, rows_task):
+        debug = logger.isEnabledFor(logging.DEBUG)
+        while True:
+            table_name, partition_no, batch, last_key = self._get()
+            if batch is _END:
+                if table_name is None:
+                    break
+                self.writer.complete_partition(table_name, partition_no)
+                # A split table is complete once all of its partitions are
+                pending[table_name] -= 1
+                if pending[table_name]:
+                    continue
+                self.writer.commit()
+                logger.info(f"Wrote {self.writer.row_counts[table_name]} rows to table: {table_name}")
+                progress.advance(progress_task)
+                continue
+            if isinstance(batch, LargeObjectPiece):
+                started = time.time()
+                self.writer.write_large_object_piece(batch)
+                self.metrics.record_write(table_name, 0, time.time() - started)
+                continue
+            started = time.time()
+            self.writer.insert_rows(table_name, tables[table_name], batch, checkpoint=(partition_no, last_key))
+            write_seconds = time.time() - started
+            self.metrics.record_write(table_name, len(batch), write_seconds)
+            if debug:
+                logger.debug(f"Wrote {len(batch)} rows to {table_name} in {write_seconds:.3f}s, {self._queue.qsize()} batches queued")
+            self.rows_written += len(batch)
+            progress.advance(rows_task, len(batch))
+
+        # The estimates are approximate, so the bar ends on the number of rows actually written
+        self.rows_expected = self.rows_written
+        progress.update(rows_task, completed=self.rows_written, total=self.rows_written)
+        self.writer.finalize(tables.items())
@@ -0,0 +1,326 @@
+import concurrent.futures
+import math
+import re
+import sqlite3
+import threading
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dbconvert.core.defaults import DEFAULT_VERIFY_CHUNK_ROWS
+from dbconvert.core.loggingsetup import LoggerManager
+from dbconvert.writers.sqlite_writer import SQLiteWriter, quote_identifier
+
+logger = LoggerManager.get_logger()
+
+# Upper bound on the key ranges of one table
+MAX_CHUNKS_PER_TABLE = 10000
+
+# Keys listed per kind of difference in the report
+SAMPLE_KEYS = 10
+
+_HASH_MODULUS = 2 ** 64
+
+# Text that SQLite stores as a number in a column with numeric affinity
+_NUMERIC_TEXT = re.compile(r"\s*[+-]?(?:(\d+)|\d+\.\d*(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+|\.\d+(?:[eE][+-]?\d+)?)\s*\Z")
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def column_affinity(declared_type: str) -> str:
+    """Return the affinity SQLite gives a column with this declared type."""
+    declared_type = declared_type.upper()
+    if "INT" in declared_type:
+        return "INTEGER"
+    if "CHAR" in declared_type or "CLOB" in declared_type or "TEXT" in declared_type:
+        return "TEXT"
+    if "BLOB" in declared_type or not declared_type:
+        return "BLOB"
+    if "REAL" in declared_type or "FLOA" in declared_type or "DOUB" in declared_type:
+        return "REAL"
+    return "NUMERIC"
+
+
+def _to_number(value):
+    if isinstance(value, str):
+        match = _NUMERIC_TEXT.match(value)
+        if match is None:
+            return value
+        if match.group(1) is not None:
+            number = int(value)
+            if _INT64_MIN <= number <= _INT64_MAX:
+                return number
+        return float(value)
+    return value
+
+
+def _to_real(value):
+    value = _to_number(value)
+    return float(value) if isinstance(value, int) else value
+
+
+def _to_text(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "Inf" if value > 0 else "-Inf"
+        # SQLite renders REAL values with "%!.15g", which always keeps a decimal point in the mantissa
+        mantissa, e, exponent = f"{value:.15g}".partition("e")
+        return (mantissa if "." in mantissa else mantissa + ".0") + e + exponent
+    if isinstance(value, int):
+        return str(int(value))
+    return value
+
+
+# Conversion applied by each affinity, and the value types it leaves unchanged
+_AFFINITY_CONVERTERS: Dict[str, Tuple[Callable[[Any], Any], frozenset]] = {
+    "INTEGER": (_to_number, frozenset((int, float, bool, bytes, type(None)))),
+    "NUMERIC": (_to_number, frozenset((int, float, bool, bytes, type(None)))),
+    "REAL": (_to_real, frozenset((float, bytes, type(None)))),
+    "TEXT": (_to_text, frozenset((str, bytes, type(None)))),
+}
+
+
+class Verifier:
+    """Check that a converted SQLite file matches its source database.
+
+    Every table is split into primary key ranges of about `chunk_rows` rows.
+    Each range is read on both sides, in parallel, and reduced to a row count
+    and an order-independent hash: the sum of the hashes of its rows. Only
+    ranges whose counts or hashes differ are read again row by row, to find
+    the keys that are missing, extra or different.
+
+    Source rows go through the converter's value converters and then through
+    the type affinity of their SQLite column (e.g. numeric text stored in a
+    NUMERIC column becomes a number), so they compare equal to what the
+    conversion stored. Row hashes use Python's `hash`, so they are only
+    comparable within one run.
+    """
+
+    def __init__(self, converter, sqlite_path: str, chunk_rows: int = DEFAULT_VERIFY_CHUNK_ROWS, workers: Optional[int] = None):
+        if chunk_rows <= 0:
+            raise ValueError("Chunk rows must be a positive integer")
+        self.converter = converter
+        self.sqlite_path = sqlite_path
+        self.chunk_rows = chunk_rows
+        self.workers = workers or converter.workers
+        self._local = threading.local()
+
+    def _target(self) -> sqlite3.Connection:
+        """Return this thread's read-only connection to the converted file."""
+        conn = getattr(self._local, "target", None)
+        if conn is None:
+            uri = Path(self.sqlite_path).resolve().as_uri() + "?mode=ro"
+            conn = self._local.target = sqlite3.connect(uri, uri=True)
+        return conn
+
+    def run(self, table_names: Optional[List[str]] = None, counts_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Verify the given tables (all tables selected by the converter's filters by default) and return a report per table."""
+        if table_names is None:
+            table_names = self.converter.get_table_names()
+        tables = self.converter.reflect_tables(table_names)
+
+        target = self._target()
+        existing = {row[0] for row in target.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        reports = {}
+        for table_name in tables:
+            reports[table_name] = {
+                "ok": table_name in existing,
+                "source_rows": 0,
+                "sqlite_rows": 0,
+                "chunks": 0,
+                "mismatched_chunks": 0,
+                "missing": [],
+                "extra": [],
+                "different": [],
+                "seconds": 0.0,
+            }
+            if table_name not in existing:
+                reports[table_name]["error"] = "table is missing from the SQLite file"
+        tables = {name: meta for name, meta in tables.items() if name in existing}
+
+        if counts_only:
+            self._count(tables, reports)
+        else:
+            self._hash(tables, reports)
+        return reports
+
+    def _count(self, tables: Dict[str, Dict[str, Any]], reports: Dict[str, Dict[str, Any]]):
+        from sqlalchemy import text
+
+        with self.converter.engine.connect() as conn:
+            for table_name in tables:
+                started = time.perf_counter()
+                report = reports[table_name]
+                select = self.converter.build_select(table_name)
+                report["source_rows"] = conn.execute(text(f"SELECT COUNT(*) FROM ({select}) AS counted")).scalar()
+                report["sqlite_rows"] = self._target().execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+                report["ok"] = report["source_rows"] == report["sqlite_rows"]
+                report["seconds"] = round(time.perf_counter() - started, 3)
+
+    def chunk_column(self, meta: Dict[str, Any]) -> Optional[str]:
+        """Return the integer primary key a table is chunked on, if any.
+
+        Other keys are not split, since the source and SQLite may order them
+        differently (e.g. text under another collation).
+        """
+        column = self.converter.get_partition_column(meta)
+        if column is None:
+            return None
+        col = next(col for col in meta["columns"] if col["name"] == column)
+        return column if issubclass(col["type"].python_type, int) else None
+
+    def _hash(self, tables: Dict[str, Dict[str, Any]], reports: Dict[str, Dict[str, Any]]):
+        chunks: List[Tuple[str, Optional[str], Tuple[Any, Any]]] = []
+        with self.converter.engine.connect() as conn:
+            for table_name, meta in tables.items():
+                column = self.chunk_column(meta)
+                ranges = [(None, None)]
+                if column is not None:
+                    ranges = self.converter.plan_partitions(conn, table_name, meta, self.chunk_rows, MAX_CHUNKS_PER_TABLE)
+                chunks.extend((table_name, column, bounds) for bounds in ranges)
+                reports[table_name]["chunks"] = len(ranges)
+
+        logger.info(f"Hashing {len(chunks)} chunks of {len(tables)} tables with {self.workers} workers per side")
+        started = {table_name: time.perf_counter() for table_name in tables}
+        # Source and SQLite reads run in separate pools, so neither side waits for the other
+        with concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="dbconvert-verify-source") as source_pool, \
+                concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="dbconvert-verify-sqlite") as sqlite_pool:
+            futures = [
+                (chunk, source_pool.submit(self._source_chunk, tables[chunk[0]], *chunk),
+                 sqlite_pool.submit(self._sqlite_chunk, tables[chunk[0]], *chunk))
+                for chunk in chunks
+            ]
+            for (table_name, column, bounds), source_future, sqlite_future in futures:
+                source_count, source_hash = source_future.result()
+                sqlite_count, sqlite_hash = sqlite_future.result()
+                report = reports[table_name]
+                report["source_rows"] += source_count
+                report["sqlite_rows"] += sqlite_count
+                if (source_count, source_hash) != (sqlite_count, sqlite_hash):
+                    report["mismatched_chunks"] += 1
+                    self._drill_down(tables[table_name], table_name, column, bounds, report)
+                report["seconds"] = round(time.perf_counter() - started[table_name], 3)
+
+        for table_name in tables:
+            report = reports[table_name]
+            report["ok"] = report["source_rows"] == report["sqlite_rows"] and not report["mismatched_chunks"]
+
+    @staticmethod
+    def affinity_converters(meta: Dict[str, Any]) -> List[Tuple[int, Callable[[Any], Any], frozenset]]:
+        """Return the index, affinity conversion and unchanged value types of every column with an affinity."""
+        converters = []
+        for index, col in enumerate(meta["columns"]):
+            affinity = _AFFINITY_CONVERTERS.get(column_affinity(SQLiteWriter.column_type(col)))
+            if affinity is not None:
+                converters.append((index, *affinity))
+        return converters
+
+    def _source_rows(self, meta: Dict[str, Any], table_name: str, column: Optional[str], bounds: Tuple[Any, Any]):
+        """Yield batches of source rows in the form SQLite stores them."""
+        where, params = self.converter.partition_where(column, bounds)
+        affinity_converters = self.affinity_converters(meta)
+        with self.converter.engine.connect() as conn:
+            for chunk in self.converter.iter_table_chunks(conn, table_name, where, params):
+                rows = self.converter.convert_batch(meta, chunk)
+                if rows and affinity_converters:
+                    columns = None
+                    for index, convert, unchanged in affinity_converters:
+                        # Most columns already hold the types SQLite keeps, which is checked without a Python call per value
+                        if set(map(type, map(itemgetter(index), rows))) <= unchanged:
+                            continue
+                        columns = columns or list(zip(*rows))
+                        columns[index] = list(map(convert, columns[index]))
+                    if columns is not None:
+                        rows = list(zip(*columns))
+                yield rows
+
+    def _sqlite_rows(self, meta: Dict[str, Any], table_name: str, column: Optional[str], bounds: Tuple[Any, Any]):
+        """Yield batches of the converted rows of one key range."""
+        from dbconvert.writers.checkpoint import encode_key
+
+        where, params = [], []
+        if column is not None:
+            if bounds[0] is not None:
+                where.append(f"{quote_identifier(column)} >= ?")
+                params.append(encode_key(bounds[0]))
+            if bounds[1] is not None:
+                where.append(f"{quote_identifier(column)} < ?")
+                params.append(encode_key(bounds[1]))
+        select_list = ", ".join(quote_identifier(col["name"]) for col in meta["columns"])
+        sql = f"SELECT {select_list} FROM {quote_identifier(table_name)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cursor = self._target().execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(self.converter.chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    @staticmethod
+    def _digest(batches) -> Tuple[int, int]:
+        count = total = 0
+        for rows in batches:
+            count += len(rows)
+            total = (total + sum(map(hash, rows))) % _HASH_MODULUS
+        return count, total
+
+    def _source_chunk(self, meta, table_name, column, bounds) -> Tuple[int, int]:
+        return self._digest(self._source_rows(meta, table_name, column, bounds))
+
+    def _sqlite_chunk(self, meta, table_name, column, bounds) -> Tuple[int, int]:
+        return self._digest(self._sqlite_rows(meta, table_name, column, bounds))
+
+    def _drill_down(self, meta: Dict[str, Any], table_name: str, column: Optional[str], bounds: Tuple[Any, Any], report: Dict[str, Any]):
+        """Compare a mismatching key range row by row and record sample keys of the differences."""
+        pk_columns = (meta.get("primary_keys") or {}).get("constrained_columns") or []
+        if not pk_columns:
+            logger.warning(f"Table {table_name} differs, but has no primary key to tell which rows")
+            return
+        names = [col["name"] for col in meta["columns"]]
+        key_indexes = [names.index(name) for name in pk_columns]
+
+        def row_hashes(batches) -> Dict[Any, int]:
+            hashes = {}
+            for rows in batches:
+                for row in rows:
+                    key = row[key_indexes[0]] if len(key_indexes) == 1 else tuple(row[index] for index in key_indexes)
+                    hashes[key] = hash(row)
+            return hashes
+
+        source = row_hashes(self._source_rows(meta, table_name, column, bounds))
+        target = row_hashes(self._sqlite_rows(meta, table_name, column, bounds))
+        for kind, keys in (
+            ("missing", [key for key in source if key not in target]),
+            ("extra", [key for key in target if key not in source]),
+            ("different", [key for key in source if key in target and source[key] != target[key]]),
+        ):
+            sample = report[kind]
+            sample.extend(keys[:SAMPLE_KEYS - len(sample)])
+            report[f"{kind}_rows"] = report.get(f"{kind}_rows", 0) + len(keys)
+
+    @staticmethod
+    def log_report(reports: Dict[str, Dict[str, Any]], seconds: float):
+        """Log one line per table and the overall result."""
+        failed = [table_name for table_name, report in reports.items() if not report["ok"]]
+        for table_name, report in reports.items():
+            if report.get("error"):
+                logger.error(f"  {table_name}: {report['error']}")
+                continue
+            line = (
+                f"  {table_name}: {report['source_rows']} source rows, {report['sqlite_rows']} SQLite rows"
+                + (f", {report['mismatched_chunks']}/{report['chunks']} chunks differ" if report["chunks"] else "")
+                + f" ({report['seconds']:.1f}s)"
+            )
+            if report["ok"]:
+                logger.info(line)
+                continue
+            logger.error(line)
+            for kind in ("missing", "extra", "different"):
+                if report.get(f"{kind}_rows"):
+                    sample = ", ".join(repr(key) for key in report[kind])
+                    logger.error(f"    {report[f'{kind}_rows']} {kind} rows, e.g. keys {sample}")
+        if failed:
+            logger.error(f"Verification failed for {len(failed)} of {len(reports)} tables in {seconds:.1f}s")
+        else:
+            logger.info(f"All {len(reports)} tables match ({seconds:.1f}s)")
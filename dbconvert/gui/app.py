@@ -1,29 +1,48 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from dbconvert.converters.converter_factory import ConverterFactory
+from dbconvert.core.defaults import DEFAULT_CHUNK_SIZE
 from dbconvert.writers.sqlite_writer import SQLiteWriter
+from dbconvert.core.pipeline import ConversionPipeline, PipelineCancelled
 from dbconvert.core.enums import DatabaseType
 from dbconvert.core.loggingsetup import LoggerManager
 import os
-from importlib.metadata import version
-from dbconvert.core.metadata import load_pyproject_metadata
+import threading
+from dbconvert.core.metadata import load_package_metadata
 from PIL import Image, ImageTk
 import webbrowser
 
 logger = LoggerManager.get_logger()
 
+# How often the window reads the progress of a running conversion
+PROGRESS_POLL_MS = 200
+
 class DbConvertGUI:
+    """Main window.
+
+    Conversions run on a background thread so the window stays responsive;
+    the main loop polls the running pipeline for progress and completion.
+    """
+
     def __init__(self):
-        self.current_version = version("dbconvert")
-        self.metadata = load_pyproject_metadata()
+        self.metadata = load_package_metadata()
+        self.current_version = self.metadata.get("version")
         self.root = tk.Tk()
         self.root.title(f"DbConvert v{self.current_version}")
         self.root.minsize(600, 400)
         
+        # The running conversion, if any: its thread, its pipeline once created, and its outcome
+        self.worker = None
+        self.pipeline = None
+        self.cancel_requested = threading.Event()
+        self.worker_error = None
+        self.closing = False
+
         self.setup_window_icon()
         self.setup_ui()
         self.setup_logging()
         self.setup_footer()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def setup_window_icon(self):
         logo_path = os.path.join(os.path.dirname(__file__), "assets", "logo.png")
@@ -67,12 +86,32 @@ class DbConvertGUI:
         ttk.Entry(path_frame, textvariable=self.sqlite_path, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(path_frame, text="Browse", command=self.browse_sqlite).pack(side=tk.RIGHT, padx=(5,0))
         
+        # Chunk size
+        ttk.Label(main_frame, text="Chunk Size (rows)").grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.chunk_size = tk.IntVar(value=DEFAULT_CHUNK_SIZE)
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=3, column=1, sticky=(tk.W, tk.E), pady=5)
+        ttk.Spinbox(options_frame, textvariable=self.chunk_size, from_=1, to=1000000, increment=1000, width=12).pack(side=tk.LEFT)
+        self.bulk_load = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Fast bulk load", variable=self.bulk_load).pack(side=tk.LEFT, padx=(10,0))
+        
         # Convert button
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
-        ttk.Button(button_frame, text="Convert", command=self.convert).pack(side=tk.LEFT, padx=(0,5))
+        button_frame.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
+        self.convert_button = ttk.Button(button_frame, text="Convert", command=self.convert)
+        self.convert_button.pack(side=tk.LEFT, padx=(0,5))
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=(0,5))
         ttk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=(0,5))
         ttk.Button(button_frame, text="Clear Output", command=self.clear_output).pack(side=tk.LEFT)
+
+        # Row progress
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        self.progress = ttk.Progressbar(progress_frame, mode="determinate")
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.progress_label = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.progress_label, width=28, anchor=tk.E).pack(side=tk.RIGHT, padx=(5,0))
         
         # Configure grid weights
         main_frame.columnconfigure(1, weight=1)
@@ -118,45 +157,123 @@ class DbConvertGUI:
         self.db_type.set(DatabaseType.values()[0])
         self.conn_string.set("")
         self.sqlite_path.set("")
+        self.chunk_size.set(DEFAULT_CHUNK_SIZE)
+        self.bulk_load.set(False)
 
     def clear_output(self):
         """Clear the output text area"""
         self.output_text.delete(1.0, tk.END)
 
     def convert(self):
-        logger = LoggerManager.get_logger()
+        if self.worker is not None:
+            return
+        # Validate inputs
+        if not self.conn_string.get():
+            logger.error("Please enter a connection string")
+            messagebox.showerror("Error", "Please enter a connection string")
+            return
+        if not self.sqlite_path.get():
+            logger.error("Please select a SQLite file path")
+            messagebox.showerror("Error", "Please select a SQLite file path")
+            return
+        try:
+            chunk_size = self.chunk_size.get()
+        except tk.TclError:
+            chunk_size = 0
+        if chunk_size <= 0:
+            logger.error("Please enter a positive chunk size")
+            messagebox.showerror("Error", "Please enter a positive chunk size")
+            return
+
+        self.pipeline = None
+        self.worker_error = None
+        self.cancel_requested.clear()
+        self.convert_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress.config(mode="indeterminate", value=0)
+        self.progress.start()
+        self.progress_label.set("Reading schema...")
+
+        # Tk variables are read here, on the main thread, and passed to the worker as plain values
+        self.worker = threading.Thread(
+            target=self.run_conversion,
+            args=(self.db_type.get(), self.conn_string.get(), self.sqlite_path.get(), chunk_size, self.bulk_load.get()),
+            name="dbconvert-gui-worker",
+            daemon=True,
+        )
+        self.worker.start()
+        self.root.after(PROGRESS_POLL_MS, self.poll_conversion)
+
+    def run_conversion(self, db_type: str, conn_string: str, sqlite_path: str, chunk_size: int, bulk_load: bool):
+        """Run a conversion on the worker thread; must not touch any widget."""
         try:
-            # Validate inputs
-            if not self.conn_string.get():
-                logger.error("Please enter a connection string")
-                messagebox.showerror("Error", "Please enter a connection string")
-                return
-            if not self.sqlite_path.get():
-                logger.error("Please select a SQLite file path")
-                messagebox.showerror("Error", "Please select a SQLite file path")
-                return
-
-            # Create converter
-            converter = ConverterFactory.create_converter(
-                self.db_type.get(),
-                self.conn_string.get()
-            )
-
-            # Read source database
-            tables = converter.read_all_tables()
-
-            # Write to SQLite
-            writer = SQLiteWriter(self.sqlite_path.get())
-            writer.write_all_tables(tables)
-
-            # Show success message
+            converter = ConverterFactory.create_converter(db_type, conn_string, chunk_size=chunk_size)
+            writer = SQLiteWriter(sqlite_path, bulk_load=bulk_load)
+            # Stream source tables into SQLite, reading and writing concurrently
+            self.pipeline = ConversionPipeline(converter, writer)
+            if self.cancel_requested.is_set():
+                self.pipeline.cancel()
+            self.pipeline.run()
+        except BaseException as e:
+            self.worker_error = e
+
+    def poll_conversion(self):
+        """Show the progress of the running conversion, and its outcome once the worker is done."""
+        pipeline = self.pipeline
+        if pipeline is not None and pipeline.rows_expected is not None:
+            if str(self.progress.cget("mode")) != "determinate":
+                self.progress.stop()
+                self.progress.config(mode="determinate")
+            self.progress.config(maximum=max(pipeline.rows_expected, pipeline.rows_written, 1), value=pipeline.rows_written)
+            self.progress_label.set(f"{pipeline.rows_written:,} / ~{pipeline.rows_expected:,} rows")
+
+        if self.worker.is_alive():
+            self.root.after(PROGRESS_POLL_MS, self.poll_conversion)
+            return
+
+        self.worker = None
+        self.progress.stop()
+        self.convert_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        if self.closing:
+            self.root.destroy()
+            return
+
+        error = self.worker_error
+        if error is None:
+            self.progress.config(mode="determinate", maximum=1, value=1)
+            self.progress_label.set(f"{pipeline.rows_written:,} rows")
             logger.info("Conversion completed successfully!")
             messagebox.showinfo("Success", "Database conversion completed successfully!")
+        elif isinstance(error, PipelineCancelled) or self.cancel_requested.is_set():
+            self.progress_label.set("Cancelled")
+            logger.warning("Conversion cancelled")
+        else:
+            self.progress_label.set("Failed")
+            logger.error(f"Error occurred during conversion: {str(error)}")
+            messagebox.showerror("Error", str(error))
+
+    def cancel(self):
+        """Stop the running conversion; readers and writer finish their current batch and exit."""
+        if self.worker is None:
+            return
+        logger.info("Cancelling conversion...")
+        self.cancel_requested.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_label.set("Cancelling...")
+        if self.pipeline is not None:
+            self.pipeline.cancel()
+
+    def on_close(self):
+        if self.worker is None:
+            self.root.destroy()
+            return
+        if not messagebox.askyesno("Quit", "A conversion is running. Cancel it and quit?"):
+            return
+        # The window is destroyed by poll_conversion once the worker has stopped
+        self.closing = True
+        self.cancel()
 
-        except Exception as e:
-            logger.error(f"Error occurred during conversion: {str(e)}")
-            messagebox.showerror("Error", str(e))
-    
     def mainloop(self):
         self.root.mainloop()
 
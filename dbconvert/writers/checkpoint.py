@@ -0,0 +1,122 @@
+import datetime
+import decimal
+import sqlite3
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+CHECKPOINT_TABLE = "_dbconvert_checkpoints"
+
+
+def encode_key(value: Any) -> Any:
+    """Turn a key or high-water mark into a value sqlite3 can bind.
+
+    Dates and times are stored the same way sqlite3 stores the rows
+    themselves. Decimals and UUIDs, which sqlite3 cannot bind, are stored as
+    their exact text, which the source compares against its own type again.
+    """
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time, decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class CheckpointJournal:
+    """Conversion progress stored inside the SQLite file being written.
+
+    Each table partition (a whole table, or one primary key range of a split
+    table) has a row with its key range, the last key committed and whether it
+    is complete. Checkpoints are updated in the same transaction as the rows
+    they describe, so after a crash the journal never claims more than what is
+    actually in the file.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def _ensure_table(self):
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                table_name TEXT NOT NULL,
+                partition_no INTEGER NOT NULL,
+                low_key,
+                high_key,
+                last_key,
+                rows_written INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (table_name, partition_no)
+            )"""
+        )
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the recorded partitions of every table, in partition order."""
+        tables: Dict[str, List[Dict[str, Any]]] = {}
+        if not self.exists(self.conn):
+            return tables
+        rows = self.conn.execute(
+            f"SELECT table_name, partition_no, low_key, high_key, last_key, rows_written, completed "
+            f"FROM {CHECKPOINT_TABLE} ORDER BY table_name, partition_no"
+        )
+        for table_name, partition_no, low_key, high_key, last_key, rows_written, completed in rows:
+            tables.setdefault(table_name, []).append({
+                "partition_no": partition_no,
+                "low_key": low_key,
+                "high_key": high_key,
+                "last_key": last_key,
+                "rows_written": rows_written,
+                "completed": bool(completed),
+            })
+        return tables
+
+    def register(self, table_name: str, partitions: List[Tuple[Any, Any]]) -> List[Dict[str, Any]]:
+        """Record the partitions of a table that is about to be read from scratch."""
+        self._ensure_table()
+        self.conn.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE table_name = ?", (table_name,))
+        self.conn.executemany(
+            f"INSERT INTO {CHECKPOINT_TABLE} (table_name, partition_no, low_key, high_key) VALUES (?, ?, ?, ?)",
+            [(table_name, i, encode_key(low), encode_key(high)) for i, (low, high) in enumerate(partitions)]
+        )
+        return [
+            {"partition_no": i, "low_key": low, "high_key": high, "last_key": None, "rows_written": 0, "completed": False}
+            for i, (low, high) in enumerate(partitions)
+        ]
+
+    def advance(self, table_name: str, partition_no: int, last_key: Any, rows: int):
+        self.conn.execute(
+            f"UPDATE {CHECKPOINT_TABLE} SET last_key = ?, rows_written = rows_written + ? "
+            f"WHERE table_name = ? AND partition_no = ?",
+            (encode_key(last_key), rows, table_name, partition_no)
+        )
+
+    def reset(self, table_name: str, partition_no: int):
+        """Forget the progress of a partition that has to be read again from its start."""
+        self.conn.execute(
+            f"UPDATE {CHECKPOINT_TABLE} SET last_key = NULL, rows_written = 0 WHERE table_name = ? AND partition_no = ?",
+            (table_name, partition_no)
+        )
+
+    def restart(self, table_name: str):
+        """Forget the progress of every partition of a table, including completed ones."""
+        self.conn.execute(
+            f"UPDATE {CHECKPOINT_TABLE} SET last_key = NULL, rows_written = 0, completed = 0 WHERE table_name = ?",
+            (table_name,)
+        )
+
+    def complete(self, table_name: str, partition_no: int):
+        self.conn.execute(
+            f"UPDATE {CHECKPOINT_TABLE} SET completed = 1 WHERE table_name = ? AND partition_no = ?",
+            (table_name, partition_no)
+        )
+
+    def drop(self):
+        self.conn.execute(f"DROP TABLE IF EXISTS {CHECKPOINT_TABLE}")
+
+    @staticmethod
+    def exists(conn: sqlite3.Connection) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHECKPOINT_TABLE,)
+        ).fetchone() is not None
+
+    def rows_written(self, table_name: str) -> int:
+        row: Optional[tuple] = self.conn.execute(
+            f"SELECT SUM(rows_written) FROM {CHECKPOINT_TABLE} WHERE table_name = ?", (table_name,)
+        ).fetchone()
+        return (row[0] if row else 0) or 0
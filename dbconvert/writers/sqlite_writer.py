@@ -1,72 +1,643 @@
+import logging
+import os
 import sqlite3
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from rich.progress import Progress
+from dbconvert.core.large_objects import LargeObject, LargeObjectPiece
 from dbconvert.core.loggingsetup import LoggerManager
+from dbconvert.writers.checkpoint import CheckpointJournal
 
 logger = LoggerManager.get_logger()
 
+DEFAULT_TRANSACTION_ROWS = 1000000
+
+def quote_identifier(name: str) -> str:
+    """Quote a table, column or index name for SQLite."""
+    return '"' + str(name).replace('"', '""') + '"'
+
 class SQLiteWriter:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        bulk_load: bool = False,
+        page_size: Optional[int] = None,
+        cache_size_mb: Optional[int] = None,
+        journal_mode: str = "OFF",
+        transaction_rows: int = DEFAULT_TRANSACTION_ROWS,
+        create_indexes: bool = True,
+        resume: bool = False,
+        optimize: bool = False,
+    ):
+        """Open the target database.
+
+        Rows are committed in transactions of up to `transaction_rows` rows,
+        together with a checkpoint in the file's `CheckpointJournal`. With
+        `resume`, an interrupted conversion found in the file continues from
+        those checkpoints instead of starting over.
+
+        Secondary indexes and unique constraints are built by `finalize`, after
+        all rows are loaded, unless `create_indexes` is False. Foreign keys are
+        declared in `CREATE TABLE` but not enforced during the load; `finalize`
+        checks them all once at the end and reports violations.
+
+        With `bulk_load`, the database is built from scratch in `<db_path>.partial`
+        with journaling, fsyncs and constraint checks turned off, and the file is
+        atomically renamed to `db_path` by `finalize`. A failed or interrupted run
+        therefore never leaves a half-written database at `db_path`.
+
+        With `optimize`, tables whose primary key is not an integer rowid alias
+        are created `WITHOUT ROWID` when their rows are likely small, and
+        `finalize` runs `ANALYZE` and compacts the file with `VACUUM INTO`, at
+        `page_size` if given.
+        """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-
-    def write_all_tables(self, tables: Dict[str, Dict[str, Any]]):
-        """Write all tables and their data to SQLite database."""
-        cursor = self.conn.cursor()
-        
-        with Progress() as progress:
-            task = progress.add_task("[cyan]Writing tables...", total=len(tables))
-            
-            for table_name, meta in tables.items():
-                logger.info(f"Creating table: {table_name}")
-                
-                # Create table with columns
-                columns = meta["columns"]
-                col_defs = []
-                
-                # Add primary key constraints
-                pk_columns = meta.get("primary_keys", {}).get("constrained_columns", [])
-                
-                for col in columns:
-                    col_name = col["name"]
-                    col_type = str(col["type"])
-                    nullable = "NOT NULL" if not col.get("nullable", True) else ""
-                    is_pk = col_name in pk_columns
-                    pk_constraint = "PRIMARY KEY" if is_pk else ""
-                    
-                    col_def = f"{col_name} {col_type} {nullable} {pk_constraint}".strip()
-                    col_defs.append(col_def)
-                
-                # Create table
-                create_sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(col_defs)})"
-                cursor.execute(create_sql)
-                
-                # Insert data
-                if meta["data"]:
-                    placeholders = ", ".join(["?"] * len(columns))
-                    insert_sql = f"INSERT INTO {table_name} VALUES ({placeholders})"
-                    
-                    # Batch insert for better performance
-                    cursor.executemany(insert_sql, meta["data"])
-                
-                progress.advance(task)
-        
-        # Add foreign key constraints
+        self.bulk_load = bulk_load
+        self.transaction_rows = transaction_rows
+        self.create_indexes = create_indexes
+        self.resume = resume
+        self.optimize = optimize
+        self.page_size = page_size
+        self.row_counts: Dict[str, int] = {}
+        # (table, row id, parent table) of every row failing a foreign key check, filled in by `finalize`
+        self.foreign_key_violations: List[Tuple[str, Any, str]] = []
+        self._rows_in_transaction = 0
+        # Large objects inserted as zero-filled placeholders: [row id, table, partition number, bytes still to write]
+        self._large_objects: Dict[LargeObject, List[Any]] = {}
+        # Placeholders not yet filled in per (table, partition), and the checkpoint held back until they are
+        self._pending_large_objects: Dict[Tuple[str, int], int] = {}
+        self._deferred_checkpoints: Dict[Tuple[str, int], List[Any]] = {}
+
+        if bulk_load:
+            if journal_mode.upper() not in ("OFF", "MEMORY"):
+                raise ValueError("Bulk load journal mode must be OFF or MEMORY")
+            self.write_path = f"{db_path}.partial"
+            if not resume and os.path.exists(self.write_path):
+                os.remove(self.write_path)
+        else:
+            self.write_path = db_path
+
+        if resume and not os.path.exists(self.write_path):
+            logger.warning(f"No interrupted conversion found at {self.write_path}, starting from scratch")
+            self.resume = False
+
+        self.conn = self._connect()
+        if self.resume and not self._can_resume():
+            self.resume = False
+            if bulk_load:
+                self.conn.close()
+                os.remove(self.write_path)
+                self.conn = self._connect()
+
+        if bulk_load:
+            self._apply_bulk_load_pragmas(page_size, cache_size_mb, journal_mode)
+        self.checkpoints = CheckpointJournal(self.conn)
+
+    @staticmethod
+    def supports_large_objects() -> bool:
+        """Tell whether values can be written in pieces, which needs `sqlite3.Connection.blobopen` (Python 3.11+)."""
+        return hasattr(sqlite3.Connection, "blobopen")
+
+    def _connect(self) -> sqlite3.Connection:
+        # The connection is handed to the pipeline's writer thread, which is the only thread using it
+        conn = sqlite3.connect(
+            self.write_path,
+            check_same_thread=False,
+            isolation_level=None if self.bulk_load else "",
+        )
+        conn.row_factory = sqlite3.Row
+        # Foreign keys are checked in one pass by `finalize` instead of on every insert
+        conn.execute("PRAGMA foreign_keys = OFF")
+        return conn
+
+    def _can_resume(self) -> bool:
+        """Check that the file holds checkpoints and survived the interruption intact."""
+        if not CheckpointJournal.exists(self.conn):
+            logger.warning(f"No checkpoints found in {self.write_path}, starting from scratch")
+            return False
+        status = self.conn.execute("PRAGMA quick_check").fetchone()[0]
+        if status != "ok":
+            # Bulk-load files are written without a journal, so a crash can corrupt them
+            if not self.bulk_load:
+                raise ValueError(f"Cannot resume, {self.write_path} is damaged: {status}")
+            logger.warning(f"Cannot resume, {self.write_path} is damaged ({status}), starting from scratch")
+            return False
+        logger.info(f"Resuming interrupted conversion in {self.write_path}")
+        return True
+
+    def _apply_bulk_load_pragmas(self, page_size: Optional[int], cache_size_mb: Optional[int], journal_mode: str):
+        # page_size only takes effect before the first table is created
+        if page_size:
+            self.conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        if cache_size_mb:
+            # A negative cache_size is a size in KiB rather than a number of pages
+            self.conn.execute(f"PRAGMA cache_size = {-int(cache_size_mb) * 1024}")
+        self.conn.execute(f"PRAGMA journal_mode = {journal_mode.upper()}")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+
+    @staticmethod
+    def column_type(col: Dict[str, Any]) -> str:
+        """Return the declared SQLite type of a column, as resolved by the converter."""
+        return col.get("sqlite_type") or str(col["type"])
+
+    def prefers_without_rowid(self, meta: Dict[str, Any]) -> bool:
+        """Tell whether a table is better stored as a WITHOUT ROWID table.
+
+        That pays off for composite or non-integer primary keys, where a rowid
+        table keeps a separate index on the key, as long as rows are small;
+        tables with BLOB columns keep their rowid.
+        """
+        pk_columns = meta.get("primary_keys", {}).get("constrained_columns", [])
+        if not pk_columns:
+            return False
+        types = {col["name"]: self.column_type(col).upper() for col in meta["columns"]}
+        if len(pk_columns) == 1 and types.get(pk_columns[0]) == "INTEGER":
+            # Already an alias of the rowid
+            return False
+        return "BLOB" not in types.values()
+
+    def order_tables(self, tables: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Order tables so that referenced tables come before the tables referencing them.
+
+        Foreign keys to tables that are not part of the conversion are dropped
+        from the metadata, since they could never be satisfied. Tables in a
+        reference cycle keep their source order after the tables they depend
+        on; SQLite does not need the referenced table to exist when a foreign
+        key is declared, so cycles only affect the load order.
+        """
+        pruned: Dict[str, Dict[str, Any]] = {}
+        parents: Dict[str, set] = {}
         for table_name, meta in tables.items():
+            foreign_keys = []
             for fk in meta.get("foreign_keys", []):
-                fk_sql = f"""
-                ALTER TABLE {table_name}
-                ADD CONSTRAINT fk_{table_name}_{fk['constrained_columns'][0]}
-                FOREIGN KEY ({', '.join(fk['constrained_columns'])})
-                REFERENCES {fk['referred_table']} ({', '.join(fk['referred_columns'])})
-                """
+                if fk["referred_table"] in tables:
+                    foreign_keys.append(fk)
+                else:
+                    logger.warning(f"Dropping foreign key of {table_name} to {fk['referred_table']}, which is not converted")
+            pruned[table_name] = {**meta, "foreign_keys": foreign_keys}
+            # Self-references do not constrain the order
+            parents[table_name] = {fk["referred_table"] for fk in foreign_keys} - {table_name}
+
+        ordered: Dict[str, Dict[str, Any]] = {}
+        remaining = list(tables)
+        while remaining:
+            ready = [table_name for table_name in remaining if not parents[table_name] - ordered.keys()]
+            if not ready:
+                # Every remaining table is in or behind a cycle; release the first one in source order
+                ready = remaining[:1]
+                logger.warning(
+                    f"Foreign key cycle involving {ready[0]}; it is loaded before the tables it references "
+                    f"({', '.join(sorted(parents[ready[0]] - ordered.keys()))})"
+                )
+            for table_name in ready:
+                ordered[table_name] = pruned[table_name]
+            remaining = [table_name for table_name in remaining if table_name not in ordered]
+        return ordered
+
+    def create_table(self, table_name: str, meta: Dict[str, Any], replace: Optional[bool] = None):
+        """Create a table from the reflected column and primary key metadata.
+
+        An existing table is dropped first if `replace` is true, which is the
+        default unless an interrupted conversion is being resumed.
+        """
+        logger.info(f"Creating table: {table_name}")
+
+        # Create table with columns
+        columns = meta["columns"]
+        col_defs = []
+
+        # Add primary key constraints
+        pk_columns = meta.get("primary_keys", {}).get("constrained_columns", [])
+
+        for col in columns:
+            col_name = quote_identifier(col["name"])
+            col_type = self.column_type(col)
+            nullable = "NOT NULL" if not col.get("nullable", True) else ""
+            is_pk = len(pk_columns) == 1 and col["name"] in pk_columns
+            pk_constraint = "PRIMARY KEY" if is_pk else ""
+
+            col_def = f"{col_name} {col_type} {nullable} {pk_constraint}".strip()
+            col_defs.append(col_def)
+
+        # Composite primary keys are declared as a table constraint
+        if len(pk_columns) > 1:
+            col_defs.append(f"PRIMARY KEY ({', '.join(quote_identifier(col) for col in pk_columns)})")
+
+        # SQLite cannot add foreign keys to an existing table, so they are declared here
+        for fk in meta.get("foreign_keys", []):
+            col_defs.append(self.foreign_key_clause(fk))
+
+        # A fresh conversion replaces tables left over from earlier runs instead of appending to them
+        if replace is None:
+            replace = not self.resume
+        if replace:
+            self.conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(table_name)}")
+
+        # Create table
+        create_sql = f"CREATE TABLE IF NOT EXISTS {quote_identifier(table_name)} ({', '.join(col_defs)})"
+        if self.optimize and self.prefers_without_rowid(meta):
+            create_sql += " WITHOUT ROWID"
+        self.conn.execute(create_sql)
+
+    @staticmethod
+    def foreign_key_clause(fk: Dict[str, Any]) -> str:
+        """Render a reflected foreign key as a table constraint."""
+        clause = (
+            f"FOREIGN KEY ({', '.join(quote_identifier(col) for col in fk['constrained_columns'])}) "
+            f"REFERENCES {quote_identifier(fk['referred_table'])}"
+        )
+        if fk.get("referred_columns"):
+            clause += f" ({', '.join(quote_identifier(col) for col in fk['referred_columns'])})"
+        options = fk.get("options") or {}
+        for action in ("ondelete", "onupdate"):
+            if options.get(action):
+                clause += f" ON {action[2:].upper()} {options[action].upper()}"
+        return clause
+
+    def insert_rows(
+        self,
+        table_name: str,
+        meta: Dict[str, Any],
+        rows,
+        checkpoint: Optional[Tuple[int, Any]] = None,
+    ) -> int:
+        """Insert one batch of rows with a single executemany call.
+
+        `checkpoint` is the (partition number, last key) reached by this batch,
+        recorded in the same transaction as the rows. Rows holding
+        `LargeObject` placeholders are inserted one by one with zero-filled
+        BLOBs, and the partition's checkpoint is held back until
+        `write_large_object_piece` has filled them in.
+        """
+        if not rows:
+            return 0
+        placeholders = ", ".join(["?"] * len(meta["columns"]))
+        insert_sql = f"INSERT INTO {quote_identifier(table_name)} VALUES ({placeholders})"
+        if self.bulk_load and not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+
+        large_rows = []
+        if meta.get("large_objects"):
+            indexes = [index for index, _ in meta["large_objects"]]
+            small_rows = []
+            for row in rows:
+                if any(isinstance(row[index], LargeObject) for index in indexes):
+                    large_rows.append(row)
+                else:
+                    small_rows.append(row)
+            rows_to_insert = small_rows
+        else:
+            rows_to_insert = rows
+        self.conn.executemany(insert_sql, rows_to_insert)
+        partition_no = checkpoint[0] if checkpoint is not None else None
+        for row in large_rows:
+            self._insert_large_object_row(table_name, row, partition_no)
+
+        if checkpoint is not None:
+            pending_key = (table_name, partition_no)
+            if self._pending_large_objects.get(pending_key):
+                deferred = self._deferred_checkpoints.setdefault(pending_key, [None, 0])
+                deferred[0] = checkpoint[1]
+                deferred[1] += len(rows)
+            else:
+                self.checkpoints.advance(table_name, partition_no, checkpoint[1], len(rows))
+
+        self.row_counts[table_name] = self.row_counts.get(table_name, 0) + len(rows)
+        self._rows_in_transaction += len(rows)
+        if self._rows_in_transaction >= self.transaction_rows:
+            self.commit()
+        return len(rows)
+
+    def _insert_large_object_row(self, table_name: str, row, partition_no: Optional[int]):
+        placeholders, params, large_objects = [], [], []
+        for value in row:
+            if isinstance(value, LargeObject):
+                placeholders.append("zeroblob(?)")
+                params.append(value.length)
+                large_objects.append(value)
+            else:
+                placeholders.append("?")
+                params.append(value)
+        cursor = self.conn.execute(f"INSERT INTO {quote_identifier(table_name)} VALUES ({', '.join(placeholders)})", params)
+        for large_object in large_objects:
+            self._large_objects[large_object] = [cursor.lastrowid, table_name, partition_no, large_object.length]
+            pending_key = (table_name, partition_no)
+            self._pending_large_objects[pending_key] = self._pending_large_objects.get(pending_key, 0) + 1
+
+    def write_large_object_piece(self, piece: LargeObjectPiece) -> int:
+        """Write one piece of a large object into its zero-filled BLOB through incremental blob I/O.
+
+        Returns the number of bytes written. Once the last placeholder of a
+        partition is complete, its held-back checkpoint is recorded.
+        """
+        state = self._large_objects[piece.large_object]
+        rowid, table_name, partition_no = state[0], state[1], state[2]
+        with self.conn.blobopen(table_name, piece.large_object.column, rowid) as blob:
+            blob.seek(piece.offset)
+            blob.write(piece.data)
+        state[3] -= len(piece.data)
+        if state[3] > 0:
+            return len(piece.data)
+
+        del self._large_objects[piece.large_object]
+        pending_key = (table_name, partition_no)
+        self._pending_large_objects[pending_key] -= 1
+        if not self._pending_large_objects[pending_key]:
+            del self._pending_large_objects[pending_key]
+            deferred = self._deferred_checkpoints.pop(pending_key, None)
+            if deferred is not None:
+                self.checkpoints.advance(table_name, partition_no, deferred[0], deferred[1])
+        return len(piece.data)
+
+    def add_missing_columns(self, table_name: str, meta: Dict[str, Any]) -> List[str]:
+        """Add source columns that an existing table does not have yet, returning their names."""
+        table = quote_identifier(table_name)
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        added = []
+        for col in meta["columns"]:
+            if col["name"] in existing:
+                continue
+            # Added columns cannot be NOT NULL, existing rows get NULL
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {quote_identifier(col['name'])} {self.column_type(col)}")
+            added.append(col["name"])
+        return added
+
+    def upsert_rows(self, table_name: str, meta: Dict[str, Any], rows) -> int:
+        """Insert a batch of rows, updating rows that already exist with the same primary key."""
+        if not rows:
+            return 0
+        pk_columns = meta.get("primary_keys", {}).get("constrained_columns", [])
+        if not pk_columns:
+            raise ValueError(f"Cannot upsert into {table_name}, it has no primary key")
+
+        columns = [col["name"] for col in meta["columns"]]
+        updates = [col for col in columns if col not in pk_columns]
+        conflict = "DO UPDATE SET " + ", ".join(
+            f"{quote_identifier(col)} = excluded.{quote_identifier(col)}" for col in updates
+        ) if updates else "DO NOTHING"
+        upsert_sql = (
+            f"INSERT INTO {quote_identifier(table_name)} ({', '.join(quote_identifier(col) for col in columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))}) "
+            f"ON CONFLICT ({', '.join(quote_identifier(col) for col in pk_columns)}) {conflict}"
+        )
+        self.conn.executemany(upsert_sql, rows)
+        return len(rows)
+
+    def delete_rows(self, table_name: str, meta: Dict[str, Any], keys) -> int:
+        """Delete rows by primary key; `keys` holds one tuple of primary key values per row."""
+        if not keys:
+            return 0
+        pk_columns = meta.get("primary_keys", {}).get("constrained_columns", [])
+        delete_sql = (
+            f"DELETE FROM {quote_identifier(table_name)} WHERE "
+            + " AND ".join(f"{quote_identifier(col)} = ?" for col in pk_columns)
+        )
+        self.conn.executemany(delete_sql, keys)
+        return len(keys)
+
+    def table_exists(self, table_name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone() is not None
+
+    @staticmethod
+    def key_order_matches(meta: Dict[str, Any], key_column: Optional[str]) -> bool:
+        """Whether SQLite orders the stored values of a key column the same way as the source.
+
+        Only integer keys stored as INTEGER qualify. Text keys are ordered by
+        the source's collation (case-insensitive by default on MySQL), which
+        SQLite's binary comparison does not reproduce, so key ranges and
+        checkpoints of such tables cannot be applied to the rows already written.
+        """
+        if key_column is None:
+            return False
+        col = next(col for col in meta["columns"] if col["name"] == key_column)
+        try:
+            python_type = col["type"].python_type
+        except NotImplementedError:
+            return False
+        return issubclass(python_type, int) and "INT" in SQLiteWriter.column_type(col).upper()
+
+    def discard_uncommitted(self, table_name: str, key_column: str, partition: Dict[str, Any]):
+        """Delete rows of an interrupted partition that lie past its last checkpoint.
+
+        Only valid for keys whose order SQLite shares with the source, see
+        `key_order_matches`; other tables are read again with `restart_table`.
+        """
+        col = quote_identifier(key_column)
+        where, params = [], []
+        if partition["low_key"] is not None:
+            where.append(f"{col} >= ?")
+            params.append(partition["low_key"])
+        if partition["high_key"] is not None:
+            where.append(f"{col} < ?")
+            params.append(partition["high_key"])
+        if partition["last_key"] is not None:
+            where.append(f"{col} > ?")
+            params.append(partition["last_key"])
+        delete_sql = f"DELETE FROM {quote_identifier(table_name)}"
+        if where:
+            delete_sql += " WHERE " + " AND ".join(where)
+        self.conn.execute(delete_sql, params)
+
+    def restart_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """Empty a table and reset all of its partitions, so it is read again from scratch.
+
+        Returns the reset partitions.
+        """
+        self.conn.execute(f"DELETE FROM {quote_identifier(table_name)}")
+        self.checkpoints.restart(table_name)
+        self.row_counts[table_name] = 0
+        return self.checkpoints.load()[table_name]
+
+    def complete_partition(self, table_name: str, partition_no: int):
+        self.checkpoints.complete(table_name, partition_no)
+
+    def write_table(self, table_name: str, meta: Dict[str, Any]) -> int:
+        """Create a table and insert its data, one batch at a time.
+
+        `meta` carries either a lazy `chunks` iterator of row batches (see
+        `BaseConverter.stream_all_tables`) or a fully loaded `data` list.
+        """
+        self.create_table(table_name, meta)
+
+        batches = meta["chunks"] if "chunks" in meta else [meta.get("data") or []]
+        row_count = 0
+        for batch in batches:
+            row_count += self.insert_rows(table_name, meta, batch)
+
+        self.commit()
+        return row_count
+
+    def commit(self):
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self._rows_in_transaction = 0
+
+    def close(self):
+        """Close the connection, discarding anything not yet committed.
+
+        After a failed conversion, committed rows and their checkpoints stay in
+        the file so the run can be resumed.
+        """
+        self.conn.close()
+
+    def write_all_tables(
+        self,
+        tables: Union[Dict[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]],
+        total: Optional[int] = None,
+    ):
+        """Write all tables and their data to SQLite database.
+
+        `tables` is either the dict returned by `read_all_tables` or the
+        iterator returned by `stream_all_tables`.
+        """
+        if isinstance(tables, dict):
+            total = len(tables)
+            tables = self.order_tables(tables).items()
+
+        written = []
+        with Progress(disable=not logger.isEnabledFor(logging.INFO)) as progress:
+            task = progress.add_task("[cyan]Writing tables...", total=total)
+
+            for table_name, meta in tables:
+                self.write_table(table_name, meta)
+                written.append((table_name, meta))
+                progress.advance(task)
+
+        self.finalize(written)
+
+    def _index_definitions(self, table_name: str, meta: Dict[str, Any]) -> List[Tuple[str, List[str], bool]]:
+        """Collect (name, columns, unique) for the secondary indexes and unique constraints of a table."""
+        definitions = []
+        seen = set()
+
+        candidates = [(uc.get("name"), uc.get("column_names") or [], True) for uc in meta.get("unique_constraints", [])]
+        for index in meta.get("indexes", []):
+            if index.get("duplicates_constraint"):
+                continue
+            if any(key.endswith("_where") and value is not None for key, value in (index.get("dialect_options") or {}).items()):
+                logger.warning(f"Skipping partial index {index.get('name')} on {table_name}")
+                continue
+            candidates.append((index.get("name"), index.get("column_names") or [], bool(index.get("unique"))))
+
+        for name, columns, unique in candidates:
+            if not columns or None in columns:
+                logger.warning(f"Skipping expression index {name} on {table_name}")
+                continue
+            if (tuple(columns), unique) in seen:
+                continue
+            seen.add((tuple(columns), unique))
+            name = name or f"{'uq' if unique else 'ix'}_{table_name}_{'_'.join(columns)}"
+            definitions.append((name, columns, unique))
+        return definitions
+
+    def build_indexes(self, tables: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, str, float]]:
+        """Build secondary indexes on loaded tables, largest table first.
+
+        Returns (table, index, seconds) for every index built.
+        """
+        tables = sorted(tables, key=lambda item: self.row_counts.get(item[0], 0), reverse=True)
+        used_names = {
+            row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'table')")
+        }
+        timings = []
+        for table_name, meta in tables:
+            for name, columns, unique in self._index_definitions(table_name, meta):
+                # Index names are global in SQLite but only per table in MySQL
+                if name in used_names:
+                    name = f"{table_name}_{name}"
+                used_names.add(name)
+
+                index_sql = (
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {quote_identifier(name)} "
+                    f"ON {quote_identifier(table_name)} ({', '.join(quote_identifier(col) for col in columns)})"
+                )
+                started = time.perf_counter()
                 try:
-                    cursor.execute(fk_sql)
-                except sqlite3.OperationalError as e:
-                    logger.warning(f"Could not add foreign key constraint: {str(e)}")
-        
-        self.conn.commit()
+                    self.conn.execute(index_sql)
+                except sqlite3.DatabaseError as e:
+                    logger.warning(f"Could not create index {name} on {table_name}: {str(e)}")
+                    continue
+                elapsed = time.perf_counter() - started
+                timings.append((table_name, name, elapsed))
+                logger.info(f"Built index {name} on {table_name} in {elapsed:.2f}s")
+        return timings
+
+    def check_foreign_keys(self, tables: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Any, str]]:
+        """Check the declared foreign keys of all loaded tables and report the violations.
+
+        Returns (table, row id, parent table) for every row whose reference
+        cannot be found; the rows themselves are kept.
+        """
+        violations = []
+        started = time.perf_counter()
+        for table_name, meta in tables:
+            if not meta.get("foreign_keys"):
+                continue
+            try:
+                rows = self.conn.execute(f"PRAGMA foreign_key_check({quote_identifier(table_name)})").fetchall()
+            except sqlite3.DatabaseError as e:
+                # e.g. the referenced columns have no unique index, because indexes were skipped
+                logger.warning(f"Could not check foreign keys of {table_name}: {str(e)}")
+                continue
+            violations.extend((row[0], row[1], row[2]) for row in rows)
+
+        counts: Dict[Tuple[str, str], int] = {}
+        for table_name, _, parent in violations:
+            counts[(table_name, parent)] = counts.get((table_name, parent), 0) + 1
+        for (table_name, parent), count in sorted(counts.items()):
+            logger.warning(f"{count} rows of {table_name} reference missing rows of {parent}")
+        if not violations:
+            logger.info(f"Checked foreign keys in {time.perf_counter() - started:.2f}s")
+        return violations
+
+    def finalize(self, tables: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Add indexes and check foreign keys once all data is loaded, then commit and close the database."""
+        tables = list(tables)
+        self.checkpoints.drop()
+        self.commit()
+        if self.create_indexes:
+            self.build_indexes(tables)
+        self.foreign_key_violations = self.check_foreign_keys(tables)
+
+        self.commit()
+        compacted_path = self.optimize_database() if self.optimize else None
         self.conn.close()
-        
-        logger.info(f"Successfully wrote database to: {self.db_path}") 
\ No newline at end of file
+
+        if compacted_path is not None:
+            os.replace(compacted_path, self.db_path)
+            if self.write_path != self.db_path:
+                os.remove(self.write_path)
+        elif self.bulk_load:
+            os.replace(self.write_path, self.db_path)
+
+        logger.info(f"Successfully wrote database to: {self.db_path}")
+
+    def optimize_database(self) -> str:
+        """Gather planner statistics and write a compacted copy of the database.
+
+        `ANALYZE` fills `sqlite_stat1`, and `VACUUM INTO` writes a
+        defragmented copy, at `page_size` if given. Returns the path of that
+        copy, which `finalize` moves into place.
+        """
+        started = time.perf_counter()
+        self.conn.execute("ANALYZE")
+        self.commit()
+        logger.info(f"Analyzed database in {time.perf_counter() - started:.2f}s")
+
+        compacted_path = f"{self.db_path}.vacuum"
+        if os.path.exists(compacted_path):
+            os.remove(compacted_path)
+        if self.page_size:
+            # A pending page size is used by the VACUUM INTO copy
+            self.conn.execute(f"PRAGMA page_size = {int(self.page_size)}")
+        started = time.perf_counter()
+        self.conn.execute("VACUUM INTO ?", (compacted_path,))
+        logger.info(
+            f"Compacted database from {os.path.getsize(self.write_path) / (1024 * 1024):.1f} MB "
+            f"to {os.path.getsize(compacted_path) / (1024 * 1024):.1f} MB in {time.perf_counter() - started:.2f}s"
+        )
+        return compacted_path
@@ -0,0 +1,39 @@
+import sqlite3
+from typing import Dict, Any, Tuple
+from dbconvert.writers.checkpoint import encode_key
+
+SYNC_TABLE = "_dbconvert_sync"
+
+
+class SyncState:
+    """High-water marks of incremental syncs, stored in the SQLite snapshot they apply to.
+
+    For every synced table the column used as high-water mark and the largest
+    value seen so far are recorded. The next sync reads only rows at or past
+    that value.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {SYNC_TABLE} (
+                table_name TEXT PRIMARY KEY,
+                hwm_column TEXT NOT NULL,
+                high_water_mark,
+                synced_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )"""
+        )
+
+    def load(self) -> Dict[str, Tuple[str, Any]]:
+        """Return (column, high-water mark) for every table synced before."""
+        rows = self.conn.execute(f"SELECT table_name, hwm_column, high_water_mark FROM {SYNC_TABLE}")
+        return {table_name: (column, mark) for table_name, column, mark in rows}
+
+    def save(self, table_name: str, column: str, high_water_mark: Any):
+        self.conn.execute(
+            f"INSERT INTO {SYNC_TABLE} (table_name, hwm_column, high_water_mark, synced_at) "
+            f"VALUES (?, ?, ?, CURRENT_TIMESTAMP) "
+            f"ON CONFLICT (table_name) DO UPDATE SET hwm_column = excluded.hwm_column, "
+            f"high_water_mark = excluded.high_water_mark, synced_at = excluded.synced_at",
+            (table_name, column, encode_key(high_water_mark))
+        )
@@ -0,0 +1,20 @@
+import datetime
+import decimal
+import sqlite3
+import uuid
+
+import pytest
+
+from dbconvert.writers.sync_state import SyncState
+
+
+@pytest.mark.parametrize("mark, stored", [
+    (decimal.Decimal("12.50"), "12.50"),
+    (uuid.UUID(int=5), "00000000-0000-0000-0000-000000000005"),
+    (datetime.datetime(2024, 1, 2, 3, 4, 5), "2024-01-02 03:04:05"),
+    (42, 42),
+])
+def test_high_water_marks_are_stored_in_a_bindable_form(mark, stored):
+    state = SyncState(sqlite3.connect(":memory:"))
+    state.save("orders", "version", mark)
+    assert state.load() == {"orders": ("version", stored)}